@@ -13,10 +13,9 @@ from collections import namedtuple # For sidebar settings return
 
 # Import from local modules
 from theme import THEME, apply_theme_css, STATUS_COLORS
-from data_processing import load_data, calculate_rolling_average, get_weekly_summary
-from data_generator import generate_sample_data
+from data_processing import load_data, get_weekly_summary
 from analysis import get_recommendations
-from visualization import create_plotly_chart, create_weekly_summary_chart
+from visualization import cached_plotly_chart, cached_weekly_summary_chart
 from team_readiness import render_match_readiness_dashboard
 
 # Page Configuration
@@ -146,15 +145,6 @@ def setup_sidebar(df_for_player_list):
             )
 
 
-# --- Data Loading Section ---
-@st.cache_data(ttl=600)
-def get_data(uploaded_file_obj):
-    """Loads data based on the uploaded file object, using cache."""
-    # Pass the file object directly to load_data
-    df = load_data(uploaded_file_obj)
-    return df
-
-
 # --- UI Rendering Functions ---
 def render_header(view, player=None):
     """Renders the main dashboard header."""
@@ -174,17 +164,17 @@ def render_header(view, player=None):
     </div>
     """, unsafe_allow_html=True)
 
-def render_metrics(df_filtered, risk_thresh):
-    """Renders the key metric cards."""
-    if df_filtered.empty:
+def render_metrics(df_filtered, n_days, recent_df, risk_thresh):
+    """Renders the key metric cards. `recent_df` is the precomputed tail slice of `df_filtered`."""
+    if n_days == 0:
         avg_score = np.nan; recent_avg = np.nan; days_below_threshold = 0
         risk_percent = 0; recent_days_count = 0; trend_icon = ""
     else:
         avg_score = df_filtered["emboss_baseline_score"].mean()
-        recent_days_count = min(5, len(df_filtered))
-        recent_avg = df_filtered.tail(recent_days_count)["emboss_baseline_score"].mean() if recent_days_count > 0 else np.nan
+        recent_days_count = len(recent_df)
+        recent_avg = recent_df["emboss_baseline_score"].mean() if recent_days_count > 0 else np.nan
         days_below_threshold = (df_filtered["emboss_baseline_score"] < risk_thresh).sum()
-        total_days = len(df_filtered)
+        total_days = n_days
         risk_percent = (days_below_threshold / total_days) * 100 if total_days > 0 else 0
         trend_val = np.nan
         if not np.isnan(recent_avg) and not np.isnan(avg_score): trend_val = recent_avg - avg_score
@@ -205,13 +195,12 @@ def render_metrics(df_filtered, risk_thresh):
     st.markdown("<div style='height: 1.5rem;'></div>", unsafe_allow_html=True)
     return days_below_threshold
 
-def render_status_box(df_filtered, risk_thresh):
-    """Displays the overall status summary box."""
-    recent_data = df_filtered.sort_values('date').tail(7)
+def render_status_box(recent_data, risk_thresh):
+    """Displays the overall status summary box for the precomputed last-7-days slice."""
     recommendations_info = get_recommendations(recent_data, risk_thresh)
     status = recommendations_info['status']; title = recommendations_info['title']
     status_class = status; emoji, text = title.split(" ", 1) if " " in title else ("", title)
-    st.markdown(f'<div class="status-box {status_class}"><div class="status-icon">{emoji}</div><div><h3>{text}</h3><small>Based on the last {min(7, len(recent_data))} days.</small></div></div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="status-box {status_class}"><div class="status-icon">{emoji}</div><div><h3>{text}</h3><small>Based on the last {len(recent_data)} days.</small></div></div>', unsafe_allow_html=True)
 
 def render_chart_area(df_filtered, risk_thresh, show_roll_avg, roll_window, weekly_summary_df, show_weekly_tab, player):
     """Renders the main chart area."""
@@ -222,41 +211,37 @@ def render_chart_area(df_filtered, risk_thresh, show_roll_avg, roll_window, week
          st.info("No chart data to display."); st.markdown("</div>", unsafe_allow_html=True); return
     chart_tabs = st.tabs(tabs_to_show)
     with chart_tabs[0]:
-        fig_trend = create_plotly_chart(df_filtered, risk_thresh, show_roll_avg, roll_window, player)
+        fig_trend = cached_plotly_chart(df_filtered, risk_thresh, show_roll_avg, roll_window, player)
         st.plotly_chart(fig_trend, use_container_width=True, config={'displayModeBar': False})
     if len(chart_tabs) > 1:
         with chart_tabs[1]:
             if weekly_summary_df is not None and not weekly_summary_df.empty:
-                fig_weekly = create_weekly_summary_chart(weekly_summary_df)
+                fig_weekly = cached_weekly_summary_chart(weekly_summary_df)
                 st.plotly_chart(fig_weekly, use_container_width=True, config={'displayModeBar': False})
             else: st.info("Weekly summary data not available.")
     st.markdown("</div>", unsafe_allow_html=True)
 
-def calculate_data_insights(df_filtered):
+def calculate_data_insights(df_filtered, n_days):
     """Calculates additional insights."""
-    insights = []; n = len(df_filtered)
-    if n < 3: return insights
+    insights = []
+    if n_days < 3: return insights
     try:
         scores = pd.to_numeric(df_filtered['emboss_baseline_score'], errors='coerce')
         valid_scores = scores.dropna(); n_valid = len(valid_scores)
         if n_valid < 3: return insights
-        df_valid = df_filtered.loc[valid_scores.index]
-        if n_valid >= 3:
-            best_day_idx = valid_scores.idxmax(); worst_day_idx = valid_scores.idxmin()
-            best_day = df_valid.loc[best_day_idx]; worst_day = df_valid.loc[worst_day_idx]
-            insights.append(f"Best day: {best_day['date'].strftime('%a, %d %b')} ({best_day['emboss_baseline_score']:.2f})")
-            insights.append(f"Worst day: {worst_day['date'].strftime('%a, %d %b')} ({worst_day['emboss_baseline_score']:.2f})")
-        if n_valid >= 3:
-            recent_scores = df_valid.tail(min(5, n_valid))['emboss_baseline_score']
-            recent_avg = recent_scores.mean(); overall_avg = valid_scores.mean()
-            trend_diff = recent_avg - overall_avg
-            if not np.isnan(trend_diff):
-                if trend_diff > 0.07: trend_desc = f"<span style='color:{THEME['SUCCESS']}'>Improving</span>"
-                elif trend_diff < -0.07: trend_desc = f"<span style='color:{THEME['ACCENT']}'>Declining</span>"
-                else: trend_desc = "Stable"
-                insights.append(f"Recent trend: {trend_desc} (Last {len(recent_scores)}d vs Period Avg: {trend_diff:+.2f})")
-            else: insights.append("Recent trend: Not available")
-        else: insights.append("Recent trend: Insufficient data")
+        best_day_idx = valid_scores.idxmax(); worst_day_idx = valid_scores.idxmin()
+        best_day = df_filtered.loc[best_day_idx]; worst_day = df_filtered.loc[worst_day_idx]
+        insights.append(f"Best day: {best_day['date'].strftime('%a, %d %b')} ({valid_scores[best_day_idx]:.2f})")
+        insights.append(f"Worst day: {worst_day['date'].strftime('%a, %d %b')} ({valid_scores[worst_day_idx]:.2f})")
+        recent_scores = valid_scores.iloc[-min(5, n_valid):]
+        recent_avg = recent_scores.mean(); overall_avg = valid_scores.mean()
+        trend_diff = recent_avg - overall_avg
+        if not np.isnan(trend_diff):
+            if trend_diff > 0.07: trend_desc = f"<span style='color:{THEME['SUCCESS']}'>Improving</span>"
+            elif trend_diff < -0.07: trend_desc = f"<span style='color:{THEME['ACCENT']}'>Declining</span>"
+            else: trend_desc = "Stable"
+            insights.append(f"Recent trend: {trend_desc} (Last {len(recent_scores)}d vs Period Avg: {trend_diff:+.2f})")
+        else: insights.append("Recent trend: Not available")
         std_dev = valid_scores.std()
         if pd.notna(std_dev) and n_valid > 1:
             if std_dev < 0.15: consistency = "Very Consistent"
@@ -268,12 +253,11 @@ def calculate_data_insights(df_filtered):
     except Exception as e: st.error(f"Error calculating insights: {e}"); insights.append("Could not calculate some insights.")
     return insights
 
-def render_recommendations_panel(df_filtered, risk_thresh):
+def render_recommendations_panel(df_filtered, n_days, recent_data, risk_thresh):
     """Renders the recommendations and insights panel."""
     st.markdown("<div class='content-block info-panel'>", unsafe_allow_html=True)
     st.markdown("<h4 class='info-panel-title'>Analysis & Recommendations</h4>", unsafe_allow_html=True)
     st.markdown("<div class='info-panel-content'>", unsafe_allow_html=True)
-    recent_data = df_filtered.sort_values('date').tail(7)
     rec_info = get_recommendations(recent_data, risk_thresh); status_class = rec_info['status']
     st.markdown(f"<h3 class='{status_class}'>{rec_info['title']}</h3>", unsafe_allow_html=True)
     metrics = rec_info['metrics']
@@ -281,11 +265,11 @@ def render_recommendations_panel(df_filtered, risk_thresh):
     min_str = f"{metrics['recent_min']:.2f}" if pd.notna(metrics['recent_min']) else "N/A"
     trend_str = f"{metrics['trend']:+.2f}" if pd.notna(metrics['trend']) else "N/A"
     var_str = f"{metrics['variability']:.2f}" if pd.notna(metrics['variability']) else "N/A"
-    st.markdown(f"<p class='analysis-text'><b>Analysis (Last {min(7, len(recent_data))} Days):</b> Avg: {avg_str} | Min: {min_str} | Risk Days: {metrics['below_threshold']} | Trend: {trend_str} | Variability: {var_str}</p>", unsafe_allow_html=True)
+    st.markdown(f"<p class='analysis-text'><b>Analysis (Last {len(recent_data)} Days):</b> Avg: {avg_str} | Min: {min_str} | Risk Days: {metrics['below_threshold']} | Trend: {trend_str} | Variability: {var_str}</p>", unsafe_allow_html=True)
     st.markdown("<h4>Recommendations</h4>", unsafe_allow_html=True)
     if rec_info['recommendations']: st.markdown(f"<ul>{''.join([f'<li>{rec}</li>' for rec in rec_info['recommendations']])}</ul>", unsafe_allow_html=True)
     else: st.markdown("<p>No specific recommendations available.</p>", unsafe_allow_html=True)
-    insights = calculate_data_insights(df_filtered)
+    insights = calculate_data_insights(df_filtered, n_days)
     if insights:
         st.markdown("<hr class='insights-separator'>", unsafe_allow_html=True)
         st.markdown("<h4>Data Insights (Selected Period)</h4>", unsafe_allow_html=True)
@@ -340,8 +324,12 @@ def render_individual_player_view(settings, df_full):
     weekly_summary_data = None
     if settings.show_weekly_summary: weekly_summary_data = get_weekly_summary(df_filtered, settings.risk_threshold)
     
+    # filter_data_by_period returns date-sorted data, so the recent windows are positional slices
+    n_days = len(df_filtered)
+    recent_data = df_filtered.iloc[-7:]
+
     # Render the top metric cards
-    render_metrics(df_filtered, settings.risk_threshold)
+    render_metrics(df_filtered, n_days, recent_data.iloc[-5:], settings.risk_threshold)
     
     left_col, right_col = st.columns([3, 2], gap="medium")
     with left_col:
@@ -349,7 +337,7 @@ def render_individual_player_view(settings, df_full):
                           settings.rolling_window, weekly_summary_data, settings.show_weekly_summary,
                           settings.selected_player)
     with right_col:
-        if settings.show_recommendations: render_recommendations_panel(df_filtered, settings.risk_threshold)
+        if settings.show_recommendations: render_recommendations_panel(df_filtered, n_days, recent_data, settings.risk_threshold)
         else:
              st.markdown("<div class='content-block info-panel'><h4 class='info-panel-title'>Analysis & Recommendations</h4><div class='info-panel-content'><p>Recovery recommendations panel is hidden via sidebar options.</p></div></div>", unsafe_allow_html=True) # Simplified placeholder
 
@@ -357,15 +345,9 @@ def render_individual_player_view(settings, df_full):
 def main():
     """Main function to run the Streamlit app."""
     # --- Initial Data Load Attempt ---
-    initial_df = None
-    try:
-        initial_df = pd.read_csv("cleaned_data/cleaned_CFC_Recovery_Status_Data.csv")
-        initial_df["date"] = pd.to_datetime(initial_df["date"], errors='coerce')
-    except FileNotFoundError:
-        initial_df = generate_sample_data()
-    except Exception as e:
-         st.sidebar.error(f"Error loading default data: {e}")
-         initial_df = generate_sample_data()
+    # Reuse the cached default load (CSV or synthetic fallback) instead of
+    # re-reading / re-generating the data on every rerun.
+    initial_df = load_data(None)
 
     if initial_df is None or initial_df.empty:
          st.sidebar.error("Could not load or generate initial data.")
@@ -376,7 +358,7 @@ def main():
     settings = setup_sidebar(initial_df)
 
     # --- Load Data Based on Upload ---
-    df_display = get_data(settings.uploaded_file) # This uses the cache
+    df_display = load_data(settings.uploaded_file) # load_data's parsing is cached with st.cache_data
 
     # --- Critical Check: Ensure display data is a DataFrame ---
     if df_display is None or df_display.empty:
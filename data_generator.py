@@ -6,9 +6,11 @@ fatigue periods, and player status differences. Adjusted to increase likelihood
 of generating enough players for a typical matchday squad (11 ready, 5 bench).
 """
 
+import hashlib
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 
 # Consistent Player List and Positions (can be shared or kept separate)
 SYNTHETIC_PLAYERS = {
@@ -27,182 +29,195 @@ KEY_PLAYERS_LIST = ["Cole Palmer", "Reece James", "Enzo Fernandez", "Moises Caic
 # Players historically more prone to injury or needing careful load management
 INJURY_PRONE_LIST = ["Romeo Lavia", "Wesley Fofana", "Reece James", "Christopher Nkunku", "Benoit Badiashile"]
 
+# --- Per-Status Simulation Parameters ---
+# Row index is the status code: 0 = Ready, 1 = Limited, 2 = Bench, 3 = Rest.
+# Each row holds the (low, high) bounds of the uniform draw for that status.
+STATUS_READY, STATUS_LIMITED, STATUS_BENCH, STATUS_REST = 0, 1, 2, 3
+RECOVERY_BASE_RANGE = np.array([[0.25, 0.55], [0.0, 0.25], [-0.15, 0.05], [-0.6, -0.25]])
+RECOVERY_VARIANCE_RANGE = np.array([[0.08, 0.20], [0.15, 0.30], [0.20, 0.35], [0.20, 0.40]])
+MATCH_IMPACT_RANGE = np.array([[0.08, 0.20], [0.15, 0.35], [0.20, 0.40], [0.30, 0.55]])
+RECOVERY_SPEED_RANGE = np.array([[0.08, 0.18], [0.05, 0.15], [0.04, 0.12], [0.02, 0.10]])
+ISSUE_SEVERITY_RANGE = np.array([[0.15, 0.30], [0.25, 0.50], [0.25, 0.50], [0.40, 0.70]])
+ISSUE_COUNT_RANGE = np.array([[0, 2], [1, 3], [1, 3], [2, 4]]) # randint-style [low, high)
+MAX_ISSUES = 3
+
+
+def _name_seeds(player_names):
+    """Stable 32-bit seed per player name (blake2s digest), independent of PYTHONHASHSEED."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2s(name.encode(), digest_size=4).digest(), 'little') for name in player_names),
+        dtype=np.uint32, count=len(player_names)
+    )
+
+
+def _uniform_by_status(rng, ranges, status_codes, size=None):
+    """Draw uniform values whose (low, high) bounds are looked up per player from `ranges`."""
+    low = ranges[status_codes, 0]
+    high = ranges[status_codes, 1]
+    if size is not None:
+        low = low[:, None]; high = high[:, None]
+        shape = (len(status_codes), size)
+    else:
+        shape = len(status_codes)
+    return low + (high - low) * rng.random(shape)
+
+
+def _apply_dips(pattern, rows, starts, lengths, severities, recovery_rate):
+    """
+    Subtract decaying dips from `pattern` in place, one per (row, start, length, severity).
+    Day i of a dip removes severity * (1 - i / length * recovery_rate). Days outside
+    [0, days) are clamped away by a mask; overlapping dips accumulate.
+    """
+    if len(rows) == 0:
+        return
+    offsets = np.arange(lengths.max())
+    day_idx = starts[:, None] + offsets
+    active = (offsets < lengths[:, None]) & (day_idx >= 0) & (day_idx < pattern.shape[1])
+    dips = severities[:, None] * (1 - (offsets / lengths[:, None]) * recovery_rate)
+    np.subtract.at(pattern, (np.broadcast_to(rows[:, None], day_idx.shape)[active], day_idx[active]), dips[active])
 
-def generate_sample_data(num_players=20, days=90):
+
+def generate_sample_data(num_players=20, days=90, seed=None):
     """
     Generate sample EMBOSS score data for a specified number of players over a period.
 
     Creates varied recovery patterns based on simulated player status.
     Adjusted percentages and score parameters aim to generate ~11+ 'Ready' players
     and ~5+ 'Bench' players according to team_readiness.py logic.
+    All players are simulated at once on a (players x days) score matrix.
+    Results are memoized per (num_players, days, seed, today); callers get a copy.
 
     Parameters:
     num_players (int): Number of players to generate data for (max based on SYNTHETIC_PLAYERS).
     days (int): Number of past days to generate data for.
+    seed (int, optional): Seed for the random Generator. Defaults to a seed derived from
+                          the player names, so the same squad gets consistent patterns.
 
     Returns:
     DataFrame: Sample data with columns 'date', 'emboss_baseline_score', 'player_name'.
     """
-    today = datetime.now().date() # Use date only for consistency
-    date_range = [today - timedelta(days=i) for i in range(days)]
-    date_range.reverse() # Chronological order
+    # The current date is part of the key so the cached dates roll over at midnight
+    return _generate_sample_data(num_players, days, seed, datetime.now().date()).copy()
+
+
+@lru_cache(maxsize=8)
+def _generate_sample_data(num_players, days, seed, today):
+    """Cached worker for generate_sample_data; the returned frame must not be mutated."""
+    today = np.datetime64(today, 'D') # Use date only for consistency
+    # Chronological order, ending today, built directly as datetime64[ns]
+    date_range = (today - np.arange(days - 1, -1, -1).astype('timedelta64[D]')).astype('datetime64[ns]')
 
     available_player_names = list(SYNTHETIC_PLAYERS.keys())
+    if seed is None:
+        # Seed based on player names for consistent yet distinct patterns per squad
+        seed = np.random.SeedSequence(_name_seeds(available_player_names))
+    rng = np.random.default_rng(seed)
     if num_players > len(available_player_names):
         print(f"Warning: Requested {num_players} players, but only {len(available_player_names)} unique names available. Using max available.")
         num_players = len(available_player_names)
 
     # Randomly select players for the simulation
-    players_to_simulate = np.random.choice(available_player_names, num_players, replace=False).tolist()
-
-    all_data = []
+    players_to_simulate = rng.choice(available_player_names, num_players, replace=False).tolist()
 
     # --- Define Player Status Categories ---
     # NEW ALLOCATION: Increase Ready and Bench percentages
-    shuffled_players = players_to_simulate.copy()
-    np.random.shuffle(shuffled_players)
-
     # Target: ~11+ Ready/Optimal (>=65 score), ~5+ Bench/Limited (>=35 score) = 16 total available
     # Let's allocate generously to ensure we usually meet the target.
     num_ready = int(num_players * 0.65)     # ~65% Ready/Optimal (Target score > 0.2 -> Readiness ~65+)
     num_limited = int(num_players * 0.15)   # ~15% Limited (Target score ~0.0-0.2 -> Readiness ~50-65) - Can contribute to bench
     num_bench = int(num_players * 0.15)     # ~15% Bench (Target score ~-0.2-0.0 -> Readiness ~35-50)
-    num_rest = num_players - num_ready - num_limited - num_bench # Remaining are 'Rest'
-
-    ready_players = shuffled_players[:num_ready]
-    limited_players = shuffled_players[num_ready : num_ready + num_limited]
-    bench_players = shuffled_players[num_ready + num_limited : num_ready + num_limited + num_bench]
-    rest_players = shuffled_players[num_ready + num_limited + num_bench:]
-
-    # print(f"Generating data with target allocation: {len(ready_players)} Ready, {len(limited_players)} Limited, {len(bench_players)} Bench, {len(rest_players)} Rest players.") # Optional print
-
-    for player_name in players_to_simulate:
-        # Seed based on player name for consistent yet distinct patterns per player
-        seed = sum(ord(c) for c in player_name)
-        np.random.seed(seed)
-
-        # --- Base Recovery Profile based on Status (ADJUSTED RANGES) ---
-        if player_name in ready_players:
-            # Target Readiness > 65 (often > 80) -> Need scores consistently > 0.2
-            recovery_base = np.random.uniform(0.25, 0.55) # Higher base score range
-            recovery_variance = np.random.uniform(0.08, 0.20) # Keep variance low for consistency
-        elif player_name in limited_players:
-            # Target Readiness 50-65 -> Need scores around 0.0 to 0.2
-            recovery_base = np.random.uniform(0.0, 0.25) # Moderate base
-            recovery_variance = np.random.uniform(0.15, 0.30) # Moderate variance
-        elif player_name in bench_players:
-            # Target Readiness 35-50 -> Need scores around -0.2 to 0.0
-            recovery_base = np.random.uniform(-0.15, 0.05) # Lower base, overlapping slightly with limited
-            recovery_variance = np.random.uniform(0.20, 0.35) # Moderate/higher variance
-        else: # rest_players
-            # Target Readiness < 35 -> Need scores consistently < -0.2
-            recovery_base = np.random.uniform(-0.6, -0.25) # Low base score
-            recovery_variance = np.random.uniform(0.20, 0.40) # Can be variable but generally low
-
-        # Adjustments for specific player types (Keep similar logic)
-        if player_name in KEY_PLAYERS_LIST and player_name in ready_players:
-            recovery_base += 0.05
-            recovery_variance *= 0.9
-        if player_name in INJURY_PRONE_LIST and player_name not in ready_players:
-             recovery_base -= 0.1
-             recovery_variance += 0.05
-
-
-        # Generate baseline scores
-        base_scores = np.random.normal(recovery_base, recovery_variance, len(date_range))
-
-        # --- Simulate Events and Patterns (Keep similar logic, maybe reduce fatigue severity slightly for Ready/Bench) ---
-        pattern = np.zeros_like(base_scores)
-
-        # Simulate match days
-        match_days_indices = np.arange(5, days, 7)
-        for md_index in match_days_indices:
-            if md_index < len(pattern):
-                # Impact slightly less severe for ready players
-                if player_name in ready_players: match_impact = np.random.uniform(0.08, 0.20) # Reduced impact
-                elif player_name in limited_players: match_impact = np.random.uniform(0.15, 0.35)
-                elif player_name in bench_players: match_impact = np.random.uniform(0.20, 0.40)
-                else: match_impact = np.random.uniform(0.30, 0.55)
-
-                pattern[md_index] -= match_impact
-
-                # Recovery curve (Ready recovers faster)
-                if player_name in ready_players: recovery_speed = np.random.uniform(0.08, 0.18) # Slightly faster recovery
-                elif player_name in limited_players: recovery_speed = np.random.uniform(0.05, 0.15)
-                elif player_name in bench_players: recovery_speed = np.random.uniform(0.04, 0.12)
-                else: recovery_speed = np.random.uniform(0.02, 0.10) # Slower recovery if less ready
-
-                cumulative_recovery = 0
-                for i in range(1, 4):
-                    if md_index + i < len(pattern):
-                        # Add recovery increment, ensuring it doesn't overshoot too much
-                        daily_recovery = recovery_speed * np.random.uniform(0.8, 1.2) # Add some daily variance
-                        cumulative_recovery += daily_recovery
-                        # Apply recovery relative to the initial dip
-                        pattern[md_index + i] += min(cumulative_recovery, match_impact * 1.1) # Allow slight overshoot
-
-
-        # Simulate fatigue/minor issue periods
-        # Reduce frequency/severity slightly for higher readiness groups
-        if player_name in ready_players: num_issues = np.random.randint(0, 2)
-        elif player_name in limited_players or player_name in bench_players: num_issues = np.random.randint(1, 3)
-        else: num_issues = np.random.randint(2, 4) # More issues for Rest players
-
-        for _ in range(num_issues):
-            issue_start = np.random.randint(0, max(1, days - 20))
-            issue_length = np.random.randint(3, 7)
-
-            if player_name in ready_players: issue_severity = np.random.uniform(0.15, 0.30) # Less severe
-            elif player_name in limited_players or player_name in bench_players: issue_severity = np.random.uniform(0.25, 0.50)
-            else: issue_severity = np.random.uniform(0.40, 0.70) # More severe for Rest
-
-            for i in range(issue_length):
-                if issue_start + i < len(pattern):
-                    recovery_factor = (i / issue_length) * 0.8
-                    pattern[issue_start + i] -= issue_severity * (1 - recovery_factor)
-
-
-        # Simulate recent status for specific groups (Keep similar logic)
-        if player_name in rest_players or (player_name in INJURY_PRONE_LIST and player_name not in ready_players):
-            recent_issue_start = days - np.random.randint(7, 14)
-            recent_issue_length = np.random.randint(4, 7)
-            recent_severity = np.random.uniform(0.4, 0.8)
-            for i in range(recent_issue_length):
-                 if recent_issue_start + i < len(pattern):
-                    recovery_factor = (i / recent_issue_length) * 0.3 # Slow recovery
-                    pattern[recent_issue_start + i] -= recent_severity * (1 - recovery_factor)
-
-        # Ensure recent positive trend/scores for Ready players
-        if player_name in ready_players:
-            for i in range(min(10, days)): # Last 10 days
-                if days - 1 - i >= 0:
-                    # Add slight positive trend
-                    pattern[days - 1 - i] += 0.005 * i
-                    # Ensure score doesn't randomly dip too low recently
-                    base_plus_pattern = base_scores[days - 1 - i] + pattern[days - 1 - i]
-                    if base_plus_pattern < 0.15: # If score dips below 0.15 recently for ready player
-                        pattern[days - 1 - i] += (0.15 - base_plus_pattern) # Nudge it back up
-
-
-        # Combine base scores with patterns and clamp to [-1, 1]
-        scores = np.clip(base_scores + pattern, -1.0, 1.0)
-
-        # Final check: Floor recent scores for Ready players
-        if player_name in ready_players:
-             for i in range(min(5, days)): # Last 5 days
-                 scores[days - 1 - i] = max(scores[days - 1 - i], np.random.uniform(0.2, 0.6)) # Ensure minimum recent score
-
-
-        # Create player DataFrame
-        player_df = pd.DataFrame({
-            'date': pd.to_datetime(date_range), # Ensure datetime objects
-            'emboss_baseline_score': scores,
-            'player_name': player_name
-        })
-        all_data.append(player_df)
-
-    # Combine all player data
-    final_df = pd.concat(all_data, ignore_index=True)
-    final_df['date'] = pd.to_datetime(final_df['date']) # Ensure datetime type again
-
-    return final_df
\ No newline at end of file
+    # Remaining are 'Rest'
+
+    # Status code per player, assigned over a shuffled order of the simulated players
+    status_codes = np.full(num_players, STATUS_REST)
+    shuffled_idx = rng.permutation(num_players)
+    status_codes[shuffled_idx[:num_ready]] = STATUS_READY
+    status_codes[shuffled_idx[num_ready:num_ready + num_limited]] = STATUS_LIMITED
+    status_codes[shuffled_idx[num_ready + num_limited:num_ready + num_limited + num_bench]] = STATUS_BENCH
+
+    is_ready = status_codes == STATUS_READY
+    is_rest = status_codes == STATUS_REST
+    is_key = np.isin(players_to_simulate, KEY_PLAYERS_LIST)
+    is_injury_prone = np.isin(players_to_simulate, INJURY_PRONE_LIST)
+    player_rows = np.arange(num_players)
+
+    # --- Base Recovery Profile based on Status (ADJUSTED RANGES) ---
+    recovery_base = _uniform_by_status(rng, RECOVERY_BASE_RANGE, status_codes)
+    recovery_variance = _uniform_by_status(rng, RECOVERY_VARIANCE_RANGE, status_codes)
+
+    # Adjustments for specific player types (Keep similar logic)
+    key_ready = is_key & is_ready
+    recovery_base[key_ready] += 0.05
+    recovery_variance[key_ready] *= 0.9
+    injury_not_ready = is_injury_prone & ~is_ready
+    recovery_base[injury_not_ready] -= 0.1
+    recovery_variance[injury_not_ready] += 0.05
+
+    # Generate baseline scores for every player in one draw, scaling standard normals per player
+    base_scores = rng.standard_normal((num_players, days))
+    base_scores *= recovery_variance[:, None]
+    base_scores += recovery_base[:, None]
+
+    # --- Simulate Events and Patterns ---
+    pattern = np.zeros((num_players, days))
+
+    # Simulate match days (weekly from day 5): impact is less severe, and recovery faster, for ready players
+    match_days_indices = np.arange(5, days, 7)
+    num_matches = len(match_days_indices)
+    match_impacts = _uniform_by_status(rng, MATCH_IMPACT_RANGE, status_codes, num_matches)
+    recovery_speeds = _uniform_by_status(rng, RECOVERY_SPEED_RANGE, status_codes, num_matches)
+    # Daily variance on the recovery increments for the 3 days after each match
+    daily_recovery = recovery_speeds[:, :, None] * rng.uniform(0.8, 1.2, (num_players, num_matches, 3))
+    # Apply recovery relative to the initial dip, allowing a slight overshoot
+    recovery_curve = np.minimum(np.cumsum(daily_recovery, axis=2), match_impacts[:, :, None] * 1.1)
+    # Match days are evenly spaced, so the dip and each recovery day are strided slice updates
+    pattern[:, 5::7] -= match_impacts
+    for i in range(1, 4):
+        recovery_days = pattern[:, 5 + i::7] # Matches too close to the end drop off this slice
+        recovery_days += recovery_curve[:, :recovery_days.shape[1], i - 1]
+
+    # Simulate fatigue/minor issue periods (more frequent and severe for lower readiness groups)
+    num_issues = rng.integers(ISSUE_COUNT_RANGE[status_codes, 0], ISSUE_COUNT_RANGE[status_codes, 1])
+    issue_starts = rng.integers(0, max(1, days - 20), (num_players, MAX_ISSUES))
+    issue_lengths = rng.integers(3, 7, (num_players, MAX_ISSUES))
+    issue_severities = _uniform_by_status(rng, ISSUE_SEVERITY_RANGE, status_codes, MAX_ISSUES)
+    has_issue = np.arange(MAX_ISSUES) < num_issues[:, None]
+    _apply_dips(pattern, np.repeat(player_rows, MAX_ISSUES)[has_issue.ravel()],
+                issue_starts[has_issue], issue_lengths[has_issue], issue_severities[has_issue], 0.8)
+
+    # Simulate recent status for specific groups (Keep similar logic)
+    has_recent_issue = is_rest | injury_not_ready
+    recent_issue_start = days - rng.integers(7, 14, num_players)
+    recent_issue_length = rng.integers(4, 7, num_players)
+    recent_severity = rng.uniform(0.4, 0.8, num_players)
+    _apply_dips(pattern, player_rows[has_recent_issue], recent_issue_start[has_recent_issue],
+                recent_issue_length[has_recent_issue], recent_severity[has_recent_issue], 0.3) # Slow recovery
+
+    # Ensure recent positive trend/scores for Ready players over the last 10 days
+    recent_window = min(10, days)
+    if recent_window > 0:
+        # Slight positive trend: day (days - 1 - i) gets +0.005 * i
+        trend = 0.005 * np.arange(recent_window - 1, -1, -1)
+        recent_pattern = pattern[is_ready, days - recent_window:] + trend
+        # Nudge back up any day where base + pattern dips below 0.15
+        floor = 0.15 - base_scores[is_ready, days - recent_window:]
+        pattern[is_ready, days - recent_window:] = np.maximum(recent_pattern, floor)
+
+    # Combine base scores with patterns and clamp to [-1, 1], reusing the base buffer
+    scores = np.add(base_scores, pattern, out=base_scores)
+    np.clip(scores, -1.0, 1.0, out=scores)
+
+    # Final check: Floor the last 5 days for Ready players at a random minimum
+    floor_window = min(5, days)
+    if floor_window > 0:
+        recent_floor = rng.uniform(0.2, 0.6, (int(is_ready.sum()), floor_window))
+        scores[is_ready, days - floor_window:] = np.maximum(scores[is_ready, days - floor_window:], recent_floor)
+
+    # Build the long-format frame in one construction: dates repeat per player,
+    # names repeat per day, and the score matrix is flattened row-major to match.
+    # player_name is categorical (small int codes + one table of names).
+    return pd.DataFrame({
+        'date': np.tile(date_range, num_players),
+        'emboss_baseline_score': scores.ravel(),
+        'player_name': pd.Categorical.from_codes(np.repeat(player_rows, days), categories=players_to_simulate)
+    })
@@ -5,11 +5,42 @@ Includes handling uploaded files, default data, synthetic data generation fallba
 rolling average calculation, and weekly summary generation.
 """
 
+import os
 import pandas as pd
+import numpy as np
 import streamlit as st
+from pandas.api.types import is_datetime64_any_dtype
 from data_generator import generate_sample_data
 from datetime import timedelta # Added timedelta here
 
+DEFAULT_DATA_PATH = "cleaned_data/cleaned_CFC_Recovery_Status_Data.csv"
+STANDARD_COLUMNS = ("date", "emboss_baseline_score", "player_name")
+WEEK_EPOCH = np.datetime64("1970-01-05", "D") # A Monday, so weeks run Monday-Sunday like 'W-SUN'
+
+def _parse_dates(values, date_format="ISO8601"):
+    """
+    Parse a date column with an explicit format and the unique-value cache.
+    Falls back to format inference if the explicit format matched nothing.
+    """
+    parsed = pd.to_datetime(values, format=date_format, errors='coerce', cache=True)
+    if parsed.isna().all() and values.notna().any():
+        parsed = pd.to_datetime(values, errors='coerce', cache=True)
+    return parsed
+
+def _clean_scores(df):
+    """
+    Shared final step for loaded CSV data: coerce scores to float32 (ample precision
+    for a -1..1 score, half the memory traffic of float64), store player names as a
+    categorical, drop rows missing a date or score, and sort by date onto a fresh
+    RangeIndex.
+    """
+    df['emboss_baseline_score'] = pd.to_numeric(df['emboss_baseline_score'], errors='coerce').astype(np.float32)
+    df['player_name'] = df['player_name'].astype('category') # Integer codes for groupby/filtering
+    df.dropna(subset=['date', 'emboss_baseline_score'], inplace=True) # Drop rows where essential data is missing
+    # Stable sort is near-linear on files already in date order and keeps same-day rows in file order;
+    # ignore_index gives a RangeIndex instead of leftover row labels
+    return df.sort_values("date", kind="stable", ignore_index=True)
+
 def load_data(uploaded_file):
     """
     Load and preprocess data from an uploaded CSV file or use a default/synthetic dataset.
@@ -22,80 +53,132 @@ def load_data(uploaded_file):
     uploaded_file: File object from Streamlit file uploader, or None.
 
     Returns:
-    DataFrame: A processed DataFrame with 'date' (datetime), 'emboss_baseline_score' (float),
-               and 'player_name' (str) columns, sorted by date. Returns None on failure.
+    DataFrame: A processed DataFrame with 'date' (datetime), 'emboss_baseline_score' (float32),
+               and 'player_name' (categorical) columns, sorted by date. Returns None on failure.
+               Not cached itself: uploads are cached on their contents, and the default file
+               on its mtime, which is looked up on every call so an updated file is re-read.
     """
-    df = None
     if uploaded_file:
-        try:
-            temp_df = pd.read_csv(uploaded_file)
-
-            # Check for standard format
-            if "emboss_baseline_score" in temp_df.columns and "date" in temp_df.columns:
-                df = temp_df.copy()
-                df["date"] = pd.to_datetime(df["date"], errors='coerce') # Coerce errors to NaT
-                if "player_name" not in df.columns:
-                    # st.warning("⚠️ No 'player_name' column found. Assigning 'Default Player'.") # Suppressed message
-                    df["player_name"] = "Default Player"
-
-            # Check for raw format
-            elif "metric" in temp_df.columns and "value" in temp_df.columns and "sessionDate" in temp_df.columns:
-                # st.info("Detected raw data format. Processing...") # Suppressed message
-                df = temp_df[temp_df["metric"] == "emboss_baseline_score"].copy()
-                df["date"] = pd.to_datetime(df["sessionDate"], format="%d/%m/%Y", errors='coerce') # Use specific format
-
-                # Handle player name variations
-                if "playerId" in df.columns:
-                    df.rename(columns={"playerId": "player_name"}, inplace=True)
-                elif "playerName" in df.columns:
-                    df.rename(columns={"playerName": "player_name"}, inplace=True)
-                else:
-                    # st.warning("⚠️ No player identifier column ('playerId' or 'playerName') found. Assigning 'Default Player'.") # Suppressed message
-                    df["player_name"] = "Default Player"
-
-                df = df[["date", "value", "player_name"]].rename(columns={"value": "emboss_baseline_score"})
-            else:
-                # Keep error message for format issues
-                st.error("❌ Uploaded file format not recognized. Required columns missing. "
-                         "Ensure it has ('date', 'emboss_baseline_score') or ('metric', 'value', 'sessionDate').")
-                return None
-
-            # Final processing for uploaded data
-            df['emboss_baseline_score'] = pd.to_numeric(df['emboss_baseline_score'], errors='coerce') # Ensure numeric
-            df.dropna(subset=['date', 'emboss_baseline_score'], inplace=True) # Drop rows where essential data is missing
-            df = df.sort_values("date")
-            # st.success(f"✅ Successfully loaded data for {df['player_name'].nunique()} player(s).") # Suppressed message
-            return df
-
-        except Exception as e:
-            # Keep critical error messages
-            st.error(f"❌ Error processing uploaded file: {str(e)}")
-            st.error("Please ensure the file is a valid CSV and check date formats.")
+        return _load_uploaded_data(uploaded_file)
+    # Key the default load on the file's mtime so an updated file is re-read
+    try:
+        mtime = os.path.getmtime(DEFAULT_DATA_PATH)
+    except OSError:
+        mtime = None # Missing file, _load_default_data falls back to synthetic data
+    return _load_default_data(DEFAULT_DATA_PATH, mtime)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _load_uploaded_data(uploaded_file):
+    """
+    Parse and clean an uploaded CSV (see load_data for the accepted formats).
+    Cached with st.cache_data, keyed on the uploaded file contents.
+    """
+    df = None
+    try:
+        if getattr(uploaded_file, "size", None) == 0:
+            st.error("❌ Uploaded file is empty.")
             return None
-    else:
-        # Load default data or generate sample data
-        try:
-            # Attempt to load default cleaned data
-            df = pd.read_csv("cleaned_data/cleaned_CFC_Recovery_Status_Data.csv")
-            df["date"] = pd.to_datetime(df["date"], errors='coerce')
+
+        # Sniff the header first so an unrecognized file is rejected without parsing
+        # its body, and only the needed columns are parsed otherwise
+        columns = pd.read_csv(uploaded_file, nrows=0).columns
+        uploaded_file.seek(0)
+
+        # Check for standard format
+        if "emboss_baseline_score" in columns and "date" in columns:
+            df = pd.read_csv(uploaded_file, usecols=lambda col: col in STANDARD_COLUMNS)
+            df["date"] = _parse_dates(df["date"]) # Coerce errors to NaT
             if "player_name" not in df.columns:
-                df["player_name"] = "Default Player" # Should ideally not happen for the cleaned file
-            df['emboss_baseline_score'] = pd.to_numeric(df['emboss_baseline_score'], errors='coerce') # Ensure numeric
-            df.dropna(subset=['date', 'emboss_baseline_score'], inplace=True)
-            df = df.sort_values("date")
-            # st.info("Using default recovery dataset.") # Optional: Inform user - keep this commented
-            return df
-        except FileNotFoundError:
-            # Keep warning if default is missing and synthetic is used
-            # st.warning("⚠️ Default dataset not found. Generating synthetic data for demonstration.")
-            return generate_sample_data() # Use default number of players
-        except Exception as e:
-            # Keep critical error messages
-            st.error(f"❌ Error loading default data: {str(e)}")
-            st.warning("Generating synthetic data as fallback.") # Keep this warning
-            return generate_sample_data()
+                # st.warning("⚠️ No 'player_name' column found. Assigning 'Default Player'.") # Suppressed message
+                df["player_name"] = "Default Player"
+
+        # Check for raw format
+        elif "metric" in columns and "value" in columns and "sessionDate" in columns:
+            # st.info("Detected raw data format. Processing...") # Suppressed message
+            # Handle player name variations
+            id_col = next((col for col in ("playerId", "playerName") if col in columns), None)
+
+            # Parse only the needed columns, then keep the score rows
+            keep_cols = ["sessionDate", "value"] + ([id_col] if id_col else [])
+            temp_df = pd.read_csv(uploaded_file, usecols=["metric"] + keep_cols)
+            mask = temp_df["metric"].to_numpy() == "emboss_baseline_score"
+            df = temp_df.loc[mask, keep_cols]
+            df = df.rename(columns={"value": "emboss_baseline_score", id_col: "player_name"})
+            df["date"] = pd.to_datetime(df.pop("sessionDate"), format="%d/%m/%Y", errors='coerce', cache=True) # Use specific format
+            if id_col is None:
+                # st.warning("⚠️ No player identifier column ('playerId' or 'playerName') found. Assigning 'Default Player'.") # Suppressed message
+                df["player_name"] = "Default Player"
+
+            df = df[list(STANDARD_COLUMNS)]
+        else:
+            # Keep error message for format issues
+            st.error("❌ Uploaded file format not recognized. Required columns missing. "
+                     "Ensure it has ('date', 'emboss_baseline_score') or ('metric', 'value', 'sessionDate').")
+            return None
+
+        # Final processing for uploaded data
+        df = _clean_scores(df)
+        # st.success(f"✅ Successfully loaded data for {df['player_name'].nunique()} player(s).") # Suppressed message
+        return df
+
+    except Exception as e:
+        # Keep critical error messages
+        st.error(f"❌ Error processing uploaded file: {str(e)}")
+        st.error("Please ensure the file is a valid CSV and check date formats.")
+        return None
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _load_default_data(path, mtime):
+    """
+    Load the default cleaned dataset, falling back to synthetic data.
+    Cached separately so every session shares the parsed default frame; 'mtime' is
+    only part of the cache key, so the file is parsed again once it changes. The
+    same 10-minute ttl as uploads keeps the synthetic fallback (keyed with
+    mtime=None) regenerating, so its dates still roll over after midnight.
+    """
+    try:
+        # Attempt to load default cleaned data
+        # Only parse the columns the app uses; a callable keeps 'player_name' optional
+        df = pd.read_csv(path,
+                         usecols=lambda col: col in STANDARD_COLUMNS,
+                         dtype={"player_name": "category"}) # Scores are coerced in _clean_scores, so a bad cell drops one row
+        df["date"] = _parse_dates(df["date"])
+        if "player_name" not in df.columns:
+            df["player_name"] = "Default Player" # Should ideally not happen for the cleaned file
+        df = _clean_scores(df)
+        # st.info("Using default recovery dataset.") # Optional: Inform user - keep this commented
+        return df
+    except FileNotFoundError:
+        # Keep warning if default is missing and synthetic is used
+        # st.warning("⚠️ Default dataset not found. Generating synthetic data for demonstration.")
+        return generate_sample_data() # Use default number of players
+    except Exception as e:
+        # Keep critical error messages
+        st.error(f"❌ Error loading default data: {str(e)}")
+        st.warning("Generating synthetic data as fallback.") # Keep this warning
+        return generate_sample_data()
 
 
+def rolling_mean(values, window):
+    """
+    Trailing rolling mean of a 1-D float array, equivalent to
+    pd.Series(values).rolling(window, min_periods=1).mean().
+
+    Uses running sums (one cumsum for values, one for valid counts) instead of
+    pandas' per-window rolling machinery. NaNs are skipped, as in pandas.
+    """
+    valid = ~np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+    upper = np.arange(1, len(values) + 1)
+    lower = np.maximum(upper - window, 0)
+    counts = ccount[upper] - ccount[lower]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, (csum[upper] - csum[lower]) / counts, np.nan)
+
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
 def calculate_rolling_average(df, window=7):
     """
     Calculate the rolling average of the 'emboss_baseline_score'.
@@ -106,31 +189,28 @@ def calculate_rolling_average(df, window=7):
     window (int): The window size for the rolling average.
 
     Returns:
-    DataFrame: The original DataFrame with an added 'rolling_avg' column.
+    DataFrame: A new DataFrame with an added 'rolling_avg' column (the input is not modified).
                Returns the input df if it's None or empty.
     """
     if df is None or df.empty:
         return df
 
-    df = df.copy() # Work on a copy
-
     # Ensure window is not larger than the dataframe length for calculation
     effective_window = min(window, len(df))
     if effective_window < 1: effective_window = 1 # Should not happen, but safe guard
 
     try:
-        # Calculate rolling average, ensuring enough periods
-        df['rolling_avg'] = df['emboss_baseline_score'].rolling(
-            window=effective_window,
-            min_periods=1 # Start calculating even if window isn't full
-        ).mean()
+        # Calculate rolling average, starting even if the window isn't full
+        rolling_avg = rolling_mean(df['emboss_baseline_score'].to_numpy(dtype=float), effective_window)
     except Exception as e:
         st.warning(f"⚠️ Could not calculate rolling average smoothly: {e}. Using simple mean.")
         # Fallback: Calculate expanding mean if rolling fails (less ideal but functional)
-        df['rolling_avg'] = df['emboss_baseline_score'].expanding(min_periods=1).mean()
+        rolling_avg = df['emboss_baseline_score'].expanding(min_periods=1).mean()
 
-    return df
+    # assign() returns a new frame without deep-copying the existing columns
+    return df.assign(rolling_avg=rolling_avg)
 
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
 def get_weekly_summary(df, risk_threshold):
     """
     Generate weekly summary statistics from the recovery data.
@@ -151,34 +231,51 @@ def get_weekly_summary(df, risk_threshold):
     if df is None or df.empty:
         return pd.DataFrame(columns=['week_ending', 'mean', 'min', 'max', 'std', 'risk_days', 'days_in_week', 'risk_pct'])
 
-    df = df.copy()
-    df['date'] = pd.to_datetime(df['date']) # Ensure correct dtype
+    # assign() adds the parsed date and risk flag on a shallow copy, leaving the caller's frame as is
+    dates = df['date']
+    if not is_datetime64_any_dtype(dates): # load_data already parses dates; only convert raw input
+        dates = pd.to_datetime(dates, cache=True)
+    df = df.assign(
+        date=dates,
+        is_risk_day=df['emboss_baseline_score'].to_numpy() < risk_threshold
+    )
 
-    # Group by week ending on Sunday
-    # 'W-SUN' ensures weeks end on Sunday. Using Grouper for robustness.
-    weekly_agg = df.groupby(pd.Grouper(key='date', freq='W-SUN')).agg(
+    # Bucket dates into Monday-Sunday weeks by integer division of the day number,
+    # which is cheaper than pd.Grouper(freq='W-SUN') building its bins. Tz-aware dates
+    # (uploads with offsets) are bucketed on local wall time, as the Grouper did
+    tz = df['date'].dt.tz
+    local_dates = df['date'].dt.tz_localize(None) if tz is not None else df['date']
+    days = local_dates.to_numpy().astype('datetime64[D]')
+    valid = ~np.isnat(days)
+    if not valid.all():
+        df, days = df[valid], days[valid]
+        if df.empty:
+            return pd.DataFrame(columns=['week_ending', 'mean', 'min', 'max', 'std', 'risk_days', 'days_in_week', 'risk_pct'])
+    week_id = (days - WEEK_EPOCH).astype(np.int64) // 7
+
+    # Aggregate score stats and risk days in one pass
+    weekly_summary = df.groupby(week_id).agg(
         mean=('emboss_baseline_score', 'mean'),
         min=('emboss_baseline_score', 'min'),
         max=('emboss_baseline_score', 'max'),
         std=('emboss_baseline_score', 'std'),
+        risk_days=('is_risk_day', 'sum'),
         days_in_week=('emboss_baseline_score', 'size') # Count number of entries per week
-    ).reset_index() # Reset index to get 'date' (week ending) as a column
-
-    weekly_agg.rename(columns={'date': 'week_ending'}, inplace=True)
-
-    # Calculate risk days per week more efficiently
-    df['is_risk_day'] = df['emboss_baseline_score'] < risk_threshold
-    risk_days_per_week = df.groupby(pd.Grouper(key='date', freq='W-SUN'))['is_risk_day'].sum().reset_index()
-    risk_days_per_week.rename(columns={'date': 'week_ending', 'is_risk_day': 'risk_days'}, inplace=True)
-
-    # Merge aggregated stats with risk day counts
-    weekly_summary = pd.merge(weekly_agg, risk_days_per_week, on='week_ending', how='left')
-    weekly_summary['risk_days'] = weekly_summary['risk_days'].fillna(0).astype(int) # Fill NaNs if a week had no data
+    )
+    # Keep weeks with no data in the range, as the charts expect a continuous weekly axis
+    weekly_summary = weekly_summary.reindex(np.arange(week_id.min(), week_id.max() + 1))
+    weekly_summary['risk_days'] = weekly_summary['risk_days'].fillna(0).astype(int)
+    weekly_summary['days_in_week'] = weekly_summary['days_in_week'].fillna(0).astype(int)
+    week_ending = pd.DatetimeIndex((WEEK_EPOCH + weekly_summary.index.to_numpy() * 7 + 6).astype(local_dates.dtype))
+    weekly_summary.insert(0, 'week_ending', week_ending.tz_localize(tz) if tz is not None else week_ending)
+    weekly_summary.reset_index(drop=True, inplace=True)
 
     # Calculate risk percentage
-    weekly_summary['risk_pct'] = weekly_summary.apply(
-        lambda row: (row['risk_days'] / row['days_in_week']) * 100 if row['days_in_week'] > 0 else 0,
-        axis=1
+    days_in_week = weekly_summary['days_in_week'].to_numpy()
+    weekly_summary['risk_pct'] = np.where(
+        days_in_week > 0,
+        weekly_summary['risk_days'].to_numpy() / np.maximum(days_in_week, 1) * 100, # Guard empty weeks against 0/0
+        0.0
     )
 
     # Fill std NaN for weeks with only one data point
@@ -8,36 +8,151 @@ Excludes players without a defined position.
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from operator import itemgetter
+from pandas.api.types import is_numeric_dtype
 import plotly.graph_objects as go
 import streamlit as st
-from theme import THEME, STATUS_COLORS # Import STATUS_COLORS mapping
+from theme import THEME, STATUS_COLORS, apply_team_readiness_css # Import STATUS_COLORS mapping
 from data_generator import SYNTHETIC_PLAYERS # Import player list for positions
-import matplotlib.colors # Import for hex_to_rgb conversion
 
 # Player position mapping (can also be loaded from a file)
 PLAYER_POSITIONS = SYNTHETIC_PLAYERS # Use the map from generator
+POSITION_ORDER = {"GK": 0, "DEF": 1, "MID": 2, "FWD": 3} # Selectable positions, in lineup/column order
 
 # --- Helper Functions ---
 def _get_player_position(player_name):
     return PLAYER_POSITIONS.get(player_name, None)
 
+# Considers 'optimal' and 'ready' as fully available for starting contention
+# 'limited' and 'bench' are available but likely restricted
+AVAILABLE_STATUSES = ("optimal", "ready", "limited", "bench")
+
 def player_is_available(player_readiness_info):
-    # Considers 'optimal' and 'ready' as fully available for starting contention
-    # 'limited' and 'bench' are available but likely restricted
-    return player_readiness_info.get("status") in ["optimal", "ready", "limited", "bench"]
+    return player_readiness_info.get("status") in AVAILABLE_STATUSES
 
 # --- FIX: Helper function to convert hex to rgba ---
 def hex_to_rgba(hex_color, alpha=0.1):
     """Converts a hex color string to an rgba string."""
+    hex_digits = hex_color.lstrip('#') if isinstance(hex_color, str) else ''
     try:
-        rgb = matplotlib.colors.hex2color(hex_color)
-        return f'rgba({int(rgb[0]*255)}, {int(rgb[1]*255)}, {int(rgb[2]*255)}, {alpha})'
+        if len(hex_digits) != 6:
+            raise ValueError(f"Invalid hex color: {hex_color!r}")
+        r, g, b = (int(hex_digits[i:i + 2], 16) for i in (0, 2, 4))
+        return f'rgba({r}, {g}, {b}, {alpha})'
     except ValueError:
         # Fallback for invalid hex codes (e.g., from 'unknown' status)
         return 'rgba(108, 117, 125, 0.1)' # Default light grey with alpha
 
-# --- Core Logic (calculate_player_readiness, get_squad_recommendations remain the same) ---
+# --- Core Logic ---
+# Readiness bands as (min score, recommendation, status, max minutes), lowest first
+READINESS_BANDS = [
+    (0, "Rest / Unavailable", "rest", 0),
+    (35, "Bench Option (Max 30-45)", "bench", 30),
+    (50, "Limited Minutes (Max 60-70)", "limited", 60),
+    (65, "Available to Start", "ready", 90),
+    (80, "Start Candidate", "optimal", 90),
+]
+# Band columns as arrays for the searchsorted lookup in calculate_squad_readiness
+_band_mins, _band_recommendations, _band_statuses, _band_minutes = (np.array(col) for col in zip(*READINESS_BANDS))
+
+# Readiness score weights and penalties
+LATEST_WEIGHT, AVG_WEIGHT, TREND_WEIGHT = 0.40, 0.30, 0.15
+VARIABILITY_PENALTY_FACTOR, MAX_VARIABILITY_PENALTY = 40, 25
+RISK_DAY_PENALTY = 6
+
+# Chart background zones for the bands, with colors converted once at import
+_zone_maxes = [band[0] for band in READINESS_BANDS[1:]] + [105] # Top zone runs to the axis edge
+READINESS_ZONES = [
+    {"min": band[0], "max": zone_max, "color": hex_to_rgba(STATUS_COLORS[band[2]], 0.12), "label": band[2].capitalize()}
+    for band, zone_max in zip(READINESS_BANDS, _zone_maxes)
+]
+# Zone rectangles and labels for the chart layout, as plain dicts passed in one update_layout call
+ZONE_SHAPES = [dict(type="rect", xref="x", yref="paper", x0=zone["min"], x1=zone["max"], y0=0, y1=1, fillcolor=zone["color"], line_width=0, layer="below") for zone in READINESS_ZONES]
+ZONE_ANNOTATIONS = [dict(x=(zone["min"] + zone["max"]) / 2, y=1.02, xref="x", yref="paper", text=zone["label"], showarrow=False, font=dict(size=9, color="grey"), opacity=0.9) for zone in READINESS_ZONES]
+
+def calculate_squad_readiness(all_player_data, risk_threshold):
+    """
+    Calculates readiness for every player at once, based on each player's last
+    7 days of EMBOSS data. Same factors and bands as calculate_player_readiness,
+    computed with one sort and per-player bincount sums instead of a Python loop
+    over players.
+
+    Returns:
+    DataFrame: One row per player (sorted by name) with the calculate_player_readiness keys as columns.
+    """
+    # Integer player codes sorted by name, and one sort by (player, date). factorize sorts a
+    # Categorical by category order, so observed categories are put in name order first
+    name_column = all_player_data["player_name"]
+    if isinstance(name_column.dtype, pd.CategoricalDtype):
+        name_column = name_column.cat.remove_unused_categories()
+        name_column = name_column.cat.reorder_categories(sorted(name_column.cat.categories))
+    codes, players = pd.factorize(name_column, sort=True)
+    scores = all_player_data["emboss_baseline_score"]
+    if not is_numeric_dtype(scores): # load_data already casts to float32; coerce only raw input
+        scores = pd.to_numeric(scores, errors='coerce')
+    raw_scores = scores.to_numpy()
+    if raw_scores.dtype.kind != 'f':
+        raw_scores = raw_scores.astype(float)
+    # Risk days compare in the stored dtype (float32 from load_data), like the rest of the app;
+    # upcasting first would turn a stored -0.40 into -0.4000000059604645, below a -0.40 threshold
+    below_threshold = raw_scores < np.asarray(risk_threshold, dtype=raw_scores.dtype)
+    scores = raw_scores.astype(float)
+    dates = all_player_data["date"].to_numpy()
+    named = codes >= 0 # Rows without a player name are skipped, as groupby does
+    order = np.lexsort((dates[named], codes[named]))
+    codes, scores, below_threshold = codes[named][order], scores[named][order], below_threshold[named][order]
+    n_players = len(players)
+
+    # Use last 7 days per player, or fewer if less data available, then drop non-numeric scores
+    rows_per_player = np.bincount(codes, minlength=n_players)
+    rows_from_end = np.cumsum(rows_per_player)[codes] - np.arange(len(codes)) - 1
+    keep = (rows_from_end < 7) & ~np.isnan(scores)
+    codes, scores, below_threshold = codes[keep], scores[keep], below_threshold[keep]
+
+    # Per-player sums over the contiguous segments of the window
+    n_days = np.bincount(codes, minlength=n_players)
+    starts = np.cumsum(n_days) - n_days
+    has_data = n_days >= 3 # Need at least 3 days for some basic assessment
+    with np.errstate(invalid='ignore', divide='ignore'):
+        recent_avg = np.bincount(codes, weights=scores, minlength=n_players) / n_days
+        risk_days = np.bincount(codes, weights=below_threshold, minlength=n_players).astype(int)
+        padded = np.append(scores, np.nan) # Players with no scores left index the NaN pad
+        first_score = padded[np.where(n_days > 0, starts, len(scores))]
+        latest_score = padded[np.where(n_days > 0, starts + n_days - 1, len(scores))]
+        sq_dev = np.bincount(codes, weights=(scores - recent_avg[codes]) ** 2, minlength=n_players)
+        variability = np.where(has_data, np.sqrt(sq_dev / (n_days - 1)), np.nan)
+
+        # Trend compares the means of the two halves of the window (second half gets the extra day)
+        in_second_half = np.arange(len(codes)) - starts[codes] >= n_days[codes] // 2
+        n_second = np.bincount(codes, weights=in_second_half, minlength=n_players)
+        sum_second = np.bincount(codes, weights=scores * in_second_half, minlength=n_players)
+        half_trend = sum_second / n_second - (n_days * recent_avg - sum_second) / (n_days - n_second)
+    trend = np.where(n_days >= 4, half_trend, np.where(n_days == 3, latest_score - first_score, 0.0)) # Simple trend for 3 days
+
+    # --- Readiness Score Calculation (Weighted Factors) ---
+    normalized_latest = (latest_score + 1) / 2
+    normalized_avg = (recent_avg + 1) / 2
+    normalized_trend = np.clip(trend + 0.5, 0, 1) # Map trend range [-0.5, 0.5] -> [0, 1] approx
+
+    readiness_score = (LATEST_WEIGHT * normalized_latest * 100 + AVG_WEIGHT * normalized_avg * 100 + TREND_WEIGHT * normalized_trend * 100)
+    variability_penalty = np.minimum(variability * VARIABILITY_PENALTY_FACTOR, MAX_VARIABILITY_PENALTY)
+    readiness_score = readiness_score - variability_penalty - risk_days * RISK_DAY_PENALTY
+    readiness_score = np.where(has_data, np.clip(readiness_score, 0, 100), 0.0)
+
+    # --- Determine Status and Recommendation based on Score ---
+    band = np.searchsorted(_band_mins, readiness_score, side="right") - 1
+    recommendation = np.where(has_data, _band_recommendations[band], "Insufficient Data")
+    status = np.where(has_data, _band_statuses[band], "unknown")
+    max_minutes = np.where(has_data, _band_minutes[band], 0)
+
+    player_names = list(players)
+    return pd.DataFrame({
+        "player_name": player_names, "readiness_score": readiness_score, "recent_avg": recent_avg,
+        "risk_days": risk_days, "trend": trend, "variability": variability,
+        "recommendation": recommendation, "status": status,
+        "position": [_get_player_position(name) for name in player_names], "max_minutes": max_minutes
+    })
+
 def calculate_player_readiness(player_data, risk_threshold):
     """
     Calculates a readiness score (0-100) and status for a single player
@@ -45,150 +160,78 @@ def calculate_player_readiness(player_data, risk_threshold):
     Factors in: latest score, recent average, trend, variability, risk days.
     Also determines potential max minutes.
     """
-    player_name = player_data["player_name"].iloc[0] if not player_data.empty else "Unknown"
-    position = _get_player_position(player_name)
+    player_name = player_data["player_name"].iloc[0] if player_data is not None and not player_data.empty else "Unknown"
+
+    if player_data is not None and not player_data.empty:
+        readiness = calculate_squad_readiness(player_data.assign(player_name=player_name), risk_threshold)
+        if not readiness.empty:
+            return readiness.to_dict("records")[0]
 
     # Default values for insufficient data
-    default_readiness = {
+    return {
         "player_name": player_name, "readiness_score": 0, "recent_avg": np.nan,
         "risk_days": 0, "trend": 0, "variability": np.nan,
         "recommendation": "Insufficient Data", "status": "unknown",
-        "position": position, "max_minutes": 0
+        "position": _get_player_position(player_name), "max_minutes": 0
     }
 
-    if player_data is None or len(player_data) < 3: # Need at least 3 days for some basic assessment
-        if player_data is not None and not player_data.empty:
-             # Ensure score is numeric before calculating mean/sum
-             scores = pd.to_numeric(player_data["emboss_baseline_score"], errors='coerce')
-             default_readiness["recent_avg"] = scores.mean() # Will be NaN if all coerce
-             default_readiness["risk_days"] = (scores < risk_threshold).sum()
-        return default_readiness
-
-    # Use last 7 days, or fewer if less data available
-    recent_data = player_data.sort_values('date').tail(7).copy() # Use copy to avoid SettingWithCopyWarning
-
-    # Ensure score is numeric
-    recent_data['emboss_baseline_score'] = pd.to_numeric(recent_data['emboss_baseline_score'], errors='coerce')
-    recent_data.dropna(subset=['emboss_baseline_score'], inplace=True) # Drop rows where score is not numeric
-
-    n_days = len(recent_data)
-    if n_days < 3: # Check again after dropping NaNs
-         # Recalculate default if necessary after dropna
-         if not recent_data.empty:
-              default_readiness["recent_avg"] = recent_data["emboss_baseline_score"].mean()
-              default_readiness["risk_days"] = (recent_data["emboss_baseline_score"] < risk_threshold).sum()
-         return default_readiness
-
-
-    # Calculate metrics
-    latest_score = recent_data["emboss_baseline_score"].iloc[-1]
-    recent_avg = recent_data["emboss_baseline_score"].mean()
-    risk_days = (recent_data["emboss_baseline_score"] < risk_threshold).sum()
-
-    trend = 0
-    if n_days >= 4:
-        first_half_avg = recent_data.iloc[:n_days//2]["emboss_baseline_score"].mean()
-        second_half_avg = recent_data.iloc[n_days//2:]["emboss_baseline_score"].mean()
-        if pd.notna(first_half_avg) and pd.notna(second_half_avg):
-             trend = second_half_avg - first_half_avg
-    elif n_days == 3: # Simple trend for 3 days
-        trend = recent_data["emboss_baseline_score"].iloc[-1] - recent_data["emboss_baseline_score"].iloc[0]
-
-    variability = recent_data["emboss_baseline_score"].std() if n_days > 1 else 0
-    variability = variability if pd.notna(variability) else 0 # Handle NaN std dev for single point
-
-    # --- Readiness Score Calculation (Weighted Factors) ---
-    latest_weight = 0.40; avg_weight = 0.30; trend_weight = 0.15
-    variability_penalty_factor = 40; risk_day_penalty = 6
-    normalized_latest = (latest_score + 1) / 2
-    normalized_avg = (recent_avg + 1) / 2
-    normalized_trend = np.clip(trend + 0.5, 0, 1) # Map trend range [-0.5, 0.5] -> [0, 1] approx
-
-    readiness_score = (latest_weight * normalized_latest * 100 + avg_weight * normalized_avg * 100 + trend_weight * normalized_trend * 100)
-    variability_penalty = min(variability * variability_penalty_factor, 25)
-    readiness_score -= variability_penalty; readiness_score -= risk_days * risk_day_penalty
-    readiness_score = np.clip(readiness_score, 0, 100)
-
-    # --- Determine Status and Recommendation based on Score ---
-    if readiness_score >= 80: recommendation, status, max_minutes = "Start Candidate", "optimal", 90
-    elif readiness_score >= 65: recommendation, status, max_minutes = "Available to Start", "ready", 90
-    elif readiness_score >= 50: recommendation, status, max_minutes = "Limited Minutes (Max 60-70)", "limited", 60
-    elif readiness_score >= 35: recommendation, status, max_minutes = "Bench Option (Max 30-45)", "bench", 30
-    else: recommendation, status, max_minutes = "Rest / Unavailable", "rest", 0
-
-    return {"player_name": player_name, "readiness_score": readiness_score, "recent_avg": recent_avg, "risk_days": risk_days, "trend": trend, "variability": variability, "recommendation": recommendation, "status": status, "position": position, "max_minutes": max_minutes}
-
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
 def get_squad_recommendations(all_player_data, risk_threshold):
-    # ... (This function remains the same as the previous version) ...
+    """
+    Recommends a starting XI and bench from all players' readiness, and summarizes
+    squad status. Cached with st.cache_data, keyed on the data and threshold, so
+    reruns from unrelated widget changes reuse the previous result.
+    """
     if all_player_data is None or all_player_data.empty:
         return {"starting_xi": [], "bench": [], "unavailable": [], "positions_covered_on_bench": {}, "improving_count": 0, "declining_count": 0, "status_counts": {}}
 
-    player_groups = all_player_data.groupby("player_name")
-    player_readiness = []
-    for _, group in player_groups:
-        player_readiness.append(calculate_player_readiness(group, risk_threshold))
-
-    # Filter for selectable players (must have a position and not be 'Rest')
-    valid_positions = {'GK', 'DEF', 'MID', 'FWD'}
-    selectable_players = [
-        p for p in player_readiness
-        if player_is_available(p) and p.get("position") in valid_positions
-    ]
-    # Identify players excluded from selection (Rest status, unknown status, no position)
-    excluded_players = [
-        p for p in player_readiness
-        if not (player_is_available(p) and p.get("position") in valid_positions)
-    ]
+    readiness_df = calculate_squad_readiness(all_player_data, risk_threshold)
+    player_readiness = readiness_df.to_dict("records")
 
-    # Sort selectable players by readiness score (highest first)
-    selectable_players.sort(key=lambda x: x["readiness_score"], reverse=True)
+    # Filter for selectable players (must have a position and not be 'Rest'), sorted by
+    # readiness score (highest first); frame index i is player_readiness[i]
+    is_selectable = readiness_df["status"].isin(AVAILABLE_STATUSES) & readiness_df["position"].isin(list(POSITION_ORDER))
+    selectable_df = readiness_df[is_selectable].sort_values("readiness_score", ascending=False, kind="stable")
+    # Identify players excluded from selection (Rest status, unknown status, no position)
+    excluded_players = [player_readiness[i] for i in readiness_df.index[~is_selectable]]
 
     # --- Squad Selection Logic ---
     target_counts = {"GK": 1, "DEF": 4, "MID": 3, "FWD": 3}
-    starting_xi = []
-    bench = []
-    remaining_selectable = selectable_players.copy()
-
-    # 1. Fill positional quotas for starting XI
-    for position, target_num in target_counts.items():
-        selected_count = 0
-        players_in_pos = [p for p in remaining_selectable if p["position"] == position]
-        players_in_pos.sort(key=lambda x: x["readiness_score"], reverse=True)
-        for player in players_in_pos:
-            if selected_count < target_num:
-                starting_xi.append(player)
-                remaining_selectable.remove(player)
-                selected_count += 1
-            else:
-                break
-
-    # 2. Fill remaining XI spots (up to 11)
-    while len(starting_xi) < 11 and remaining_selectable:
-        starting_xi.append(remaining_selectable.pop(0))
+
+    # 1. Fill positional quotas for starting XI: a player makes the quota if their rank
+    # within their position (players are sorted best first) is below the target
+    rank_in_position = selectable_df.groupby("position", sort=False).cumcount()
+    in_quota = (rank_in_position < selectable_df["position"].map(target_counts)).to_numpy()
+    starting_xi = [player_readiness[i] for i in selectable_df.index[in_quota]]
+    remaining_selectable = [player_readiness[i] for i in selectable_df.index[~in_quota]]
+
+    # 2. Fill remaining XI spots (up to 11), slicing instead of repeated pop(0)
+    open_xi_spots = max(11 - len(starting_xi), 0)
+    starting_xi.extend(remaining_selectable[:open_xi_spots])
+    remaining_selectable = remaining_selectable[open_xi_spots:]
 
     # 3. Fill bench spots (up to 7)
-    while len(bench) < 7 and remaining_selectable:
-        bench.append(remaining_selectable.pop(0))
+    bench = remaining_selectable[:7]
 
     # 4. Any players left are added to unavailable
-    excluded_players.extend(remaining_selectable)
+    excluded_players.extend(remaining_selectable[7:])
 
     # Sort final lists for display
-    position_order = {"GK": 0, "DEF": 1, "MID": 2, "FWD": 3}
-    starting_xi.sort(key=lambda x: (position_order.get(x["position"], 99), -x["readiness_score"]))
-    bench.sort(key=lambda x: (-x["readiness_score"]))
-    excluded_players.sort(key=lambda x: x["readiness_score"], reverse=True)
+    starting_xi.sort(key=lambda x: (POSITION_ORDER.get(x["position"], 99), -x["readiness_score"]))
+    # bench is a slice of the best-first selectable order, so it is already sorted
+    excluded_players.sort(key=itemgetter("readiness_score"), reverse=True)
 
     # Calculate summary stats
     positions_on_bench = {p["position"] for p in bench if p.get("position")}
-    positions_covered = {pos: pos in positions_on_bench for pos in valid_positions}
-    improving_count = sum(1 for p in player_readiness if p.get("trend", 0) > 0.05 and p.get("status") != "unknown")
-    declining_count = sum(1 for p in player_readiness if p.get("trend", 0) < -0.05 and p.get("status") != "unknown")
+    positions_covered = {pos: pos in positions_on_bench for pos in POSITION_ORDER}
+    # Trend counts come straight from the readiness columns
+    assessed = readiness_df["status"].to_numpy() != "unknown"
+    trends = readiness_df["trend"].to_numpy()
+    improving_count = int(np.count_nonzero((trends > 0.05) & assessed))
+    declining_count = int(np.count_nonzero((trends < -0.05) & assessed))
+    # Every player lands in the XI, bench or unavailable, so count statuses on the frame
     status_counts = {status: 0 for status in STATUS_COLORS.keys()}
-    all_considered_players = starting_xi + bench + excluded_players
-    for p in all_considered_players:
-        status = p.get("status", "unknown")
-        status_counts[status] = status_counts.get(status, 0) + 1
+    status_counts.update(readiness_df["status"].value_counts().to_dict())
 
     return {"starting_xi": starting_xi, "bench": bench, "unavailable": excluded_players, "positions_covered_on_bench": positions_covered, "improving_count": improving_count, "declining_count": declining_count, "status_counts": status_counts}
 
@@ -205,7 +248,8 @@ def create_team_readiness_chart(player_readiness_data):
 
     sorted_data = sorted(player_readiness_data, key=lambda x: x["readiness_score"])
 
-    player_labels = []; hover_texts = []
+    # Build all per-bar lists in a single pass
+    player_labels = []; hover_texts = []; readiness_scores = []; colors = []; bar_texts = []
     for p in sorted_data:
         pos_str = f"({p.get('position', 'N/A')})" if p.get('position') else ""
         player_labels.append(f"{p['player_name']} {pos_str}".strip())
@@ -214,33 +258,26 @@ def create_team_readiness_chart(player_readiness_data):
         if p.get('status') == 'unknown' and pos_display == 'N/A': status_display = "Excluded (Missing Position/Data)"
         elif p.get('status') == 'unknown': status_display = "Insufficient Data"
         hover_texts.append(f"<b>{p['player_name']}</b> ({pos_display})<br>Readiness: {p['readiness_score']:.1f}% ({status_display})<br>Recommendation: {p.get('recommendation', 'N/A')}<br>Recent Avg: {p.get('recent_avg', 0):.2f}, Trend: {p.get('trend', 0):+.2f}<br>Risk Days (last 7): {p.get('risk_days', 0)}, Variability: {p.get('variability', 0):.2f}")
-
-    readiness_scores = [p["readiness_score"] for p in sorted_data]
-    colors = [STATUS_COLORS.get(p.get("status", "unknown"), THEME['TEXT_LIGHT']) for p in sorted_data]
+        readiness_scores.append(p["readiness_score"])
+        colors.append(STATUS_COLORS.get(p.get("status", "unknown"), THEME['TEXT_LIGHT']))
+        bar_texts.append(f"{p['readiness_score']:.0f}%")
 
     fig = go.Figure()
-    fig.add_trace(go.Bar(y=player_labels, x=readiness_scores, orientation='h', marker=dict(color=colors, line=dict(color='rgba(0,0,0,0.1)', width=0.5)), text=[f"{score:.0f}%" for score in readiness_scores], textposition='outside', hoverinfo='text', hovertext=hover_texts))
-
-    # Define readiness zones
-    # --- FIX: Use hex_to_rgba for fillcolor ---
-    zone_alpha = 0.12 # Define alpha for zones
-    readiness_zones = [
-        {"min": 0, "max": 35, "color": hex_to_rgba(STATUS_COLORS['rest'], zone_alpha), "label": "Rest"},
-        {"min": 35, "max": 50, "color": hex_to_rgba(STATUS_COLORS['bench'], zone_alpha), "label": "Bench"},
-        {"min": 50, "max": 65, "color": hex_to_rgba(STATUS_COLORS['limited'], zone_alpha), "label": "Limited"},
-        {"min": 65, "max": 80, "color": hex_to_rgba(STATUS_COLORS['ready'], zone_alpha), "label": "Ready"},
-        {"min": 80, "max": 105, "color": hex_to_rgba(STATUS_COLORS['optimal'], zone_alpha), "label": "Optimal"}
-    ]
-    # --- END FIX ---
-
-    shapes = []; annotations = []; num_players = len(player_labels)
-    for zone in readiness_zones:
-        shapes.append(go.layout.Shape(type="rect", xref="x", yref="paper", x0=zone["min"], x1=zone["max"], y0=0, y1=1, fillcolor=zone["color"], line_width=0, layer="below"))
-        annotations.append(go.layout.Annotation(x=(zone["min"] + zone["max"]) / 2, y=1.02, xref="x", yref="paper", text=zone["label"], showarrow=False, font=dict(size=9, color="grey"), opacity=0.9))
-
-    fig.update_layout(title="Team Readiness Overview", title_x=0.05, xaxis=dict(title="Calculated Readiness Score (%)", range=[0, 105], showgrid=True, gridcolor='rgba(220,220,220,0.5)'), yaxis=dict(title=None, showticklabels=True, tickfont=dict(size=10)), height=max(400, num_players * 23), margin=dict(l=150, r=40, t=80, b=50), template="plotly_white", plot_bgcolor=THEME['CARD'], paper_bgcolor=THEME['CARD'], shapes=shapes, annotations=annotations, hoverlabel=dict(bgcolor="white", font_size=12))
+    fig.add_trace(go.Bar(y=player_labels, x=readiness_scores, orientation='h', marker=dict(color=colors, line=dict(color='rgba(0,0,0,0.1)', width=0.5)), text=bar_texts, textposition='outside', hoverinfo='text', hovertext=hover_texts))
+
+    num_players = len(player_labels)
+    fig.update_layout(title="Team Readiness Overview", title_x=0.05, xaxis=dict(title="Calculated Readiness Score (%)", range=[0, 105], showgrid=True, gridcolor='rgba(220,220,220,0.5)'), yaxis=dict(title=None, showticklabels=True, tickfont=dict(size=10)), height=max(400, num_players * 23), margin=dict(l=150, r=40, t=80, b=50), template="plotly_white", plot_bgcolor=THEME['CARD'], paper_bgcolor=THEME['CARD'], shapes=ZONE_SHAPES, annotations=ZONE_ANNOTATIONS, hoverlabel=dict(bgcolor="white", font_size=12))
     return fig
 
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
+def _cached_team_readiness_chart(player_readiness_data):
+    """
+    Cached create_team_readiness_chart for the dashboard, returned as a plain figure
+    dict: st.plotly_chart accepts it directly, and a dict unpickles far faster from
+    the cache than a Figure, which re-validates every property.
+    """
+    return create_team_readiness_chart(player_readiness_data).to_dict()
+
 
 # --- Player Card Renderer (_render_player_card_v2 remains the same) ---
 def _render_player_card_v2(player, card_context='bench'):
@@ -301,6 +338,14 @@ def _render_player_card_v2(player, card_context='bench'):
     </div>
     """
 
+def _render_player_cards(players, card_context='bench'):
+    """
+    Renders several player cards as one HTML string, for a single st.markdown call.
+    Each card is stripped so no blank line splits the HTML block (an indented line
+    after a blank one would be parsed as a markdown code block).
+    """
+    return "".join(_render_player_card_v2(player, card_context).strip() for player in players)
+
 # --- Main Rendering Function (render_match_readiness_dashboard remains the same) ---
 def render_match_readiness_dashboard(all_player_data, risk_threshold):
     """
@@ -328,6 +373,8 @@ def render_match_readiness_dashboard(all_player_data, risk_threshold):
             - **Rest (<35)**: Rest / Unavailable (0 min)
             """)
          st.info("Squad selection prioritizes readiness within defined positions (GK, DEF, MID, FWD). Players without a position or with 'Rest'/'Unknown' status are excluded from XI/Bench contention.")
+         # View-specific styles, injected at the bottom of the sidebar so they take no space in the layout
+         st.markdown(apply_team_readiness_css(), unsafe_allow_html=True)
 
     # --- Main Dashboard Area ---
     st.markdown("## Match Day Squad Planner")
@@ -360,18 +407,19 @@ def render_match_readiness_dashboard(all_player_data, risk_threshold):
 
     # --- 2. Recommended Starting XI ---
     st.markdown("#### Recommended Starting XI")
-    xi_positions = {"GK": [], "DEF": [], "MID": [], "FWD": []}
+    # starting_xi comes back sorted by (position, -readiness), so each bucket is already best first
+    xi_positions = {pos: [] for pos in POSITION_ORDER}
     for player in xi:
         pos = player.get("position")
         if pos in xi_positions: xi_positions[pos].append(player)
     col_widths = [1.5, 3, 2.5, 3]; cols_xi = st.columns(col_widths, gap="medium")
-    pos_map = {"GK": 0, "DEF": 1, "MID": 2, "FWD": 3}
-    for pos_name, col_index in pos_map.items():
+    for pos_name, col_index in POSITION_ORDER.items():
         with cols_xi[col_index]:
             st.markdown(f"<h5 style='margin-bottom: 8px; text-transform: uppercase; color: {THEME['TEXT_LIGHT']}; font-size: 0.9em; letter-spacing: 0.5px;'>{pos_name}</h5>", unsafe_allow_html=True) # Styled position title
-            players_in_pos = sorted(xi_positions.get(pos_name, []), key=lambda p: p['readiness_score'], reverse=True)
+            players_in_pos = xi_positions[pos_name]
             if players_in_pos:
-                for player in players_in_pos: st.markdown(_render_player_card_v2(player, card_context='starting'), unsafe_allow_html=True)
+                # One markdown element per column instead of one per card
+                st.markdown(_render_player_cards(players_in_pos, card_context='starting'), unsafe_allow_html=True)
             else: st.caption("(None selected)")
     st.markdown("<hr style='margin: 25px 0;'>", unsafe_allow_html=True)
 
@@ -382,15 +430,19 @@ def render_match_readiness_dashboard(all_player_data, risk_threshold):
     with tab1: # Bench Tab
         if bench:
             num_bench_cols = 4; bench_cols = st.columns(num_bench_cols)
-            for i, player in enumerate(bench):
-                with bench_cols[i % num_bench_cols]: st.markdown(_render_player_card_v2(player, card_context='bench'), unsafe_allow_html=True)
+            for col_index, bench_col in enumerate(bench_cols):
+                col_players = bench[col_index::num_bench_cols] # Same round-robin layout as before
+                if col_players:
+                    with bench_col: st.markdown(_render_player_cards(col_players, card_context='bench'), unsafe_allow_html=True)
         else: st.info("No players recommended for the bench.")
     with tab2: # Unavailable Tab
         if unavailable:
              st.caption("Includes players for rest, insufficient data, missing position, or not selected due to lower readiness.")
              num_unav_cols = 4; unav_cols = st.columns(num_unav_cols)
-             for i, player in enumerate(unavailable):
-                 with unav_cols[i % num_unav_cols]: st.markdown(_render_player_card_v2(player, card_context='unavailable'), unsafe_allow_html=True)
+             for col_index, unav_col in enumerate(unav_cols):
+                 col_players = unavailable[col_index::num_unav_cols]
+                 if col_players:
+                     with unav_col: st.markdown(_render_player_cards(col_players, card_context='unavailable'), unsafe_allow_html=True)
         else: st.success("All evaluated players are available and included in XI or Bench.")
 
     # --- 4. Team Readiness Overview Chart ---
@@ -399,7 +451,7 @@ def render_match_readiness_dashboard(all_player_data, risk_threshold):
     all_players_list = xi + bench + unavailable
     if all_players_list:
         chart_data = sorted(all_players_list, key=lambda x: x['readiness_score'], reverse=False)
-        readiness_chart = create_team_readiness_chart(chart_data)
+        readiness_chart = _cached_team_readiness_chart(chart_data)
         st.plotly_chart(readiness_chart, use_container_width=True)
         st.caption("Horizontal bar chart showing calculated readiness for all evaluated players. Colors indicate status.")
     else: st.warning("No player data found.")
\ No newline at end of file
@@ -4,6 +4,9 @@ Theme configuration for the CFC Recovery Insights Dashboard.
 Modify this file to change the dashboard's appearance.
 """
 
+import re
+from functools import lru_cache
+
 # Theme color configuration
 THEME = {
     'PRIMARY': "#0D1B2A",      # Darker Blue - primary color, headers, key elements
@@ -29,40 +32,37 @@ STATUS_COLORS = {
     "unknown": THEME["TEXT_LIGHT"]
 }
 
+def _minify_css(css):
+    """
+    Strips comments and collapses whitespace in a CSS string, so the <style> block
+    sent to the browser on every rerun carries no indentation or notes.
+    """
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{}:;,])\s*", r"\1", css).strip()
+
+@lru_cache(maxsize=1)
 def apply_theme_css():
     """
     Returns CSS styling for the dashboard. Includes styles for base elements, metrics,
-    status boxes, charts, panels, and team readiness. Aims for a clean but
+    status boxes, charts and panels; team readiness styles are in
+    apply_team_readiness_css. Aims for a clean but
     slightly more visually structured 'Figma-like' feel.
+    The string only depends on the module-level colors, so it is built once and
+    reused on every Streamlit rerun.
     """
     # --- Generate Status Specific CSS Rules ---
-    status_css_rules = ""
-    # Player Cards (Team Readiness)
-    for status, color in STATUS_COLORS.items():
-        if status not in ["high_risk", "moderate_risk"]: # Exclude analysis statuses from card styling
-            status_css_rules += f"""
-            .player-card-v2.{status} {{ border-left-color: {color}; }}
-            .player-card-v2.{status} .player-status-badge {{ background-color: {color}; color: white; }}
-            .player-card-v2.{status} .readiness-score {{ color: {color}; }}
-            """
-    # Status Box & Rec Title (Individual Analysis)
+    status_css_parts = []
+    # Status Box & Rec Title (Individual Analysis), with shared title colors in one grouped rule
     for status, color in STATUS_COLORS.items():
-         status_css_rules += f"""
+         status_css_parts.append(f"""
          .status-box.{status} {{ border-left-color: {color}; background-color: {color}1A; }}
-         .status-box.{status} h3 {{ color: {color}; }}
-         .info-panel h3.{status} {{ color: {color}; }}
-         """
-
-    # Special case for unknown status badge/box color
-    status_css_rules += f"""
-        .player-card-v2.unknown .player-status-badge {{ background-color: {STATUS_COLORS['unknown']}; color: {THEME['TEXT']}; }}
-        .status-box.unknown {{ border-left-color: {STATUS_COLORS['unknown']}; background-color: {STATUS_COLORS['unknown']}1A; }}
-        .status-box.unknown h3 {{ color: {STATUS_COLORS['unknown']}; }}
-        .info-panel h3.unknown {{ color: {STATUS_COLORS['unknown']}; }}
-        """
-
-    # --- Main CSS String ---
-    return f"""
+         .status-box.{status} h3, .info-panel h3.{status} {{ color: {color}; }}
+         """)
+    status_css_rules = "".join(status_css_parts)
+
+    # --- Main CSS String (minified once, cached with the function) ---
+    return _minify_css(f"""
     <style>
         /* --- Base & General Styles --- */
         body {{
@@ -132,7 +132,7 @@ def apply_theme_css():
             border-top: 3px solid {THEME['SECONDARY']}33; padding: 15px 18px;
             text-align: center; height: 100%; /* Keep height 100% for equal height in columns */
             display: flex; flex-direction: column; justify-content: center;
-            margin-bottom: 0; /* Columns gap handles spacing */
+            margin-bottom: 1.8rem; /* Space below metrics row; cards sit in one row of columns */
             transition: box-shadow 0.2s ease, border-top-color 0.2s ease;
         }}
          .metric-card:hover {{ box-shadow: 0 3px 8px rgba(0, 0, 0, 0.07); border-top-color: {THEME['SECONDARY']}88; }}
@@ -140,13 +140,6 @@ def apply_theme_css():
         .metric-value span {{ font-size: 0.7em; margin-left: 3px; vertical-align: middle; display: inline-block; }}
         .metric-label {{ font-size: 13px; color: {THEME['TEXT_LIGHT']}; margin-bottom: 0; /* CORRECTED: Removed '10', set to 0 */ font-weight: 500; }}
 
-        /* Add space below the metrics row using CSS */
-        /* Target the element holding the columns. This selector might be unstable. */
-        /* Inspect element in browser if this doesn't work. */
-        div[data-testid="stHorizontalBlock"] > div:has(div.metric-card) {{
-             margin-bottom: 1.8rem; /* Space below metrics row */
-        }}
-
 
         /* --- Individual Player: Status Box --- */
         .status-box {{
@@ -178,12 +171,6 @@ def apply_theme_css():
         .info-panel small {{ display: block; margin-top: 15px; padding-top: 10px; border-top: 1px dashed #e0e0e0; font-size: 0.8em; color: {THEME['TEXT_LIGHT']}; font-style: italic; }}
         .info-panel .insights-separator {{ border-top: 1px solid #e9ecef; margin: 20px 0 15px 0; }}
 
-        /* --- Team Readiness Styles --- */
-        /* ... (Team styles remain unchanged) ... */
-        .summary-box {{ background-color: {THEME['CARD']}; border-radius: 6px; padding: 10px; text-align: center; border: 1px solid #e9ecef; box-shadow: 0 1px 2px rgba(0,0,0,0.05); height: 100%; display: flex; flex-direction: column; justify-content: center; margin-bottom: 10px; }} .summary-box-label {{ font-size: 0.75em; color: {THEME['TEXT_LIGHT']}; margin-bottom: 3px; font-weight: 500; text-transform: uppercase; letter-spacing: 0.5px; }} .summary-box-value {{ font-size: 1.6em; font-weight: 600; color: {THEME['PRIMARY']}; line-height: 1.1; }} .summary-box.optimal .summary-box-value {{ color: {STATUS_COLORS['optimal']}; }} .summary-box.ready .summary-box-value {{ color: {STATUS_COLORS['ready']}; }} .summary-box.limited .summary-box-value {{ color: {STATUS_COLORS['limited']}; }} .summary-box.bench .summary-box-value {{ color: {STATUS_COLORS['bench']}; }} .summary-box.rest .summary-box-value {{ color: {STATUS_COLORS['rest']}; }}
-        .player-card-v2 {{ background-color: {THEME['CARD']}; border-radius: 6px; padding: 8px 10px; margin-bottom: 6px; border-left: 5px solid grey; box-shadow: 0 1px 2px rgba(0,0,0,0.04); display: flex; justify-content: space-between; align-items: center; border: 1px solid #e9ecef; }} .player-card-v2:hover {{ box-shadow: 0 2px 5px rgba(0,0,0,0.08); transform: translateY(-1px); }} .player-card-v2 .player-info {{ flex-grow: 1; margin-right: 8px; overflow: hidden; }} .player-card-v2 .player-name {{ font-weight: 600; font-size: 0.9em; color: {THEME['TEXT']}; display: block; margin-bottom: 1px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }} .player-card-v2 .player-tag {{ font-size: 0.75em; font-weight: 600; padding: 1px 6px; border-radius: 4px; display: inline-block; text-transform: uppercase; letter-spacing: 0.5px; line-height: 1.3; text-align: center; margin-top: 2px; }} .player-card-v2 .player-status-badge {{ color: white; }} .player-card-v2 .player-position-text {{ color: {THEME['TEXT_LIGHT']}; background-color: transparent; font-weight: 500; padding: 1px 0; }} .player-card-v2 .player-readiness {{ text-align: right; white-space: nowrap; }} .player-card-v2 .readiness-score {{ font-size: 1.0em; font-weight: 700; margin-right: 2px; }} .player-card-v2 .trend-icon {{ font-size: 0.8em; margin-left: 3px; display: inline-block; vertical-align: middle; line-height: 1; }}
-
-
         /* Apply status colors via CSS rules */
         {status_css_rules}
 
@@ -192,4 +179,35 @@ def apply_theme_css():
         .dashboard-footer {{ text-align: center; padding: 20px 20px 15px 20px; color: {THEME['TEXT_LIGHT']}; font-size: 12px; border-top: 1px solid #e9ecef; margin-top: 2.5rem; }}
 
     </style>
-    """
\ No newline at end of file
+    """)
+
+@lru_cache(maxsize=1)
+def apply_team_readiness_css():
+    """
+    Returns CSS for the Match Readiness view (summary boxes and player cards).
+    Kept out of apply_theme_css so the individual player view, where most sessions
+    start, doesn't ship it; the readiness view injects it when it renders.
+    """
+    # Player card status colors; badge text is white via the base .player-status-badge rule
+    card_css_parts = []
+    for status, color in STATUS_COLORS.items():
+        if status not in ["high_risk", "moderate_risk"]: # Exclude analysis statuses from card styling
+            card_css_parts.append(f"""
+            .player-card-v2.{status} {{ border-left-color: {color}; }}
+            .player-card-v2.{status} .player-status-badge {{ background-color: {color}; }}
+            .player-card-v2.{status} .readiness-score {{ color: {color}; }}
+            """)
+    # Special case for unknown status badge text
+    card_css_parts.append(f"""
+        .player-card-v2.unknown .player-status-badge {{ color: {THEME['TEXT']}; }}
+        """)
+    card_css_rules = "".join(card_css_parts)
+
+    return _minify_css(f"""
+    <style>
+        /* --- Team Readiness Styles --- */
+        .summary-box {{ background-color: {THEME['CARD']}; border-radius: 6px; padding: 10px; text-align: center; border: 1px solid #e9ecef; box-shadow: 0 1px 2px rgba(0,0,0,0.05); height: 100%; display: flex; flex-direction: column; justify-content: center; margin-bottom: 10px; }} .summary-box-label {{ font-size: 0.75em; color: {THEME['TEXT_LIGHT']}; margin-bottom: 3px; font-weight: 500; text-transform: uppercase; letter-spacing: 0.5px; }} .summary-box-value {{ font-size: 1.6em; font-weight: 600; color: {THEME['PRIMARY']}; line-height: 1.1; }} .summary-box.optimal .summary-box-value {{ color: {STATUS_COLORS['optimal']}; }} .summary-box.ready .summary-box-value {{ color: {STATUS_COLORS['ready']}; }} .summary-box.limited .summary-box-value {{ color: {STATUS_COLORS['limited']}; }} .summary-box.bench .summary-box-value {{ color: {STATUS_COLORS['bench']}; }} .summary-box.rest .summary-box-value {{ color: {STATUS_COLORS['rest']}; }}
+        .player-card-v2 {{ background-color: {THEME['CARD']}; border-radius: 6px; padding: 8px 10px; margin-bottom: 6px; border-left: 5px solid grey; box-shadow: 0 1px 2px rgba(0,0,0,0.04); display: flex; justify-content: space-between; align-items: center; border: 1px solid #e9ecef; }} .player-card-v2:hover {{ box-shadow: 0 2px 5px rgba(0,0,0,0.08); transform: translateY(-1px); }} .player-card-v2 .player-info {{ flex-grow: 1; margin-right: 8px; overflow: hidden; }} .player-card-v2 .player-name {{ font-weight: 600; font-size: 0.9em; color: {THEME['TEXT']}; display: block; margin-bottom: 1px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }} .player-card-v2 .player-tag {{ font-size: 0.75em; font-weight: 600; padding: 1px 6px; border-radius: 4px; display: inline-block; text-transform: uppercase; letter-spacing: 0.5px; line-height: 1.3; text-align: center; margin-top: 2px; }} .player-card-v2 .player-status-badge {{ color: white; }} .player-card-v2 .player-position-text {{ color: {THEME['TEXT_LIGHT']}; background-color: transparent; font-weight: 500; padding: 1px 0; }} .player-card-v2 .player-readiness {{ text-align: right; white-space: nowrap; }} .player-card-v2 .readiness-score {{ font-size: 1.0em; font-weight: 700; margin-right: 2px; }} .player-card-v2 .trend-icon {{ font-size: 0.8em; margin-left: 3px; display: inline-block; vertical-align: middle; line-height: 1; }}
+        {card_css_rules}
+    </style>
+    """)
@@ -8,7 +8,10 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+import streamlit as st
 from theme import THEME # Ensure theme is imported
+from data_processing import rolling_mean
 
 def create_plotly_chart(df, risk_threshold, show_rolling_avg=True, window=7, player_name="Unknown Player"):
     """
@@ -22,42 +25,49 @@ def create_plotly_chart(df, risk_threshold, show_rolling_avg=True, window=7, pla
         fig.update_layout(title=f'Recovery Trend - {player_name}', height=350, plot_bgcolor=THEME['CARD']) # Reduced default height
         return fig
 
-    df_chart = df.copy()
-    df_chart['date'] = pd.to_datetime(df_chart['date'])
-    df_chart = df_chart.sort_values('date')
+    # Work on the date-sorted columns the chart reads, not a frame copy. A DatetimeIndex
+    # keeps tz-aware upload dates intact (plain NumPy would turn them into objects)
+    dates = df['date']
+    if not is_datetime64_any_dtype(dates): # Dates from load_data are already parsed; only convert raw input
+        dates = pd.to_datetime(dates)
+    dates = pd.DatetimeIndex(dates)
+    order = np.lexsort((dates.asi8, dates.isna())) # Stable, with NaT dates last
+    dates = dates[order]
+    scores = df['emboss_baseline_score'].to_numpy()[order]
+    first_date, last_date = dates.min(), dates.max() # NaT-skipping; NaT only if every date is missing
+    trace_dates = dates.tz_localize(None) if dates.tz is not None else dates # Plot local wall time, as a Series did
 
+    rolling_avg = None
     if show_rolling_avg:
-        effective_window = min(window, len(df_chart))
-        if effective_window < 1: effective_window = 1
-        df_chart['rolling_avg'] = df_chart['emboss_baseline_score'].rolling(
-            window=effective_window, min_periods=1).mean()
-
-    fig = go.Figure()
+        # rolling_mean already averages over whatever is available when the window
+        # exceeds the data (an expanding mean), so the window is not clamped to the length
+        rolling_avg = rolling_mean(scores.astype(float), max(window, 1))
 
     # Add scatter plot for individual daily scores
-    point_colors = [THEME['ACCENT'] if score < risk_threshold else THEME['SUCCESS']
-                    for score in df_chart['emboss_baseline_score']]
-    fig.add_trace(
+    # Colors as 0/1 indices into a two-stop colorscale (1 byte per point instead of a hex string)
+    point_colors = np.where(scores < risk_threshold, 0, 1).astype(np.uint8)
+    traces = [
         go.Scatter(
-            x=df_chart['date'],
-            y=df_chart['emboss_baseline_score'],
+            x=trace_dates,
+            y=scores,
             mode='markers+lines',
             name='Daily Score',
             marker=dict(
                 size=8, # Slightly smaller markers
                 color=point_colors,
+                colorscale=[[0, THEME['ACCENT']], [1, THEME['SUCCESS']]], cmin=0, cmax=1, showscale=False,
                 line=dict(width=1, color=THEME['CARD'])
             ),
             line=dict(color='rgba(108, 117, 125, 0.3)', width=1), # Slightly thicker line
             hovertemplate='<b>%{x|%a, %d %b}</b><br>Score: %{y:.2f}<extra></extra>'
         )
-    )
+    ]
 
-    if show_rolling_avg and 'rolling_avg' in df_chart.columns:
-        fig.add_trace(
+    if rolling_avg is not None:
+        traces.append(
             go.Scatter(
-                x=df_chart['date'],
-                y=df_chart['rolling_avg'],
+                x=trace_dates,
+                y=rolling_avg,
                 mode='lines',
                 name=f'{window}-Day Avg',
                 line=dict(color=THEME['PRIMARY'], width=1), # Slightly thinner avg line
@@ -65,9 +75,9 @@ def create_plotly_chart(df, risk_threshold, show_rolling_avg=True, window=7, pla
             )
         )
 
-    fig.add_trace(
+    traces.append(
         go.Scatter(
-            x=[df_chart['date'].min(), df_chart['date'].max()],
+            x=[first_date, last_date],
             y=[risk_threshold, risk_threshold],
             mode='lines',
             name='Risk Threshold',
@@ -76,16 +86,22 @@ def create_plotly_chart(df, risk_threshold, show_rolling_avg=True, window=7, pla
         )
     )
 
-    # Add shaded background areas
-    if len(df_chart) >= 1:
-        date_min = df_chart['date'].min() - pd.Timedelta(days=0.5) # Extend slightly for visuals
-        date_max = df_chart['date'].max() + pd.Timedelta(days=0.5)
-        fig.add_shape(type="rect", xref="x", yref="y",
-                      x0=date_min, y0=-1.05, x1=date_max, y1=risk_threshold,
-                      fillcolor=THEME['ACCENT'], opacity=0.06, layer="below", line_width=0) # More subtle opacity
-        fig.add_shape(type="rect", xref="x", yref="y",
-                      x0=date_min, y0=risk_threshold, x1=date_max, y1=1.05,
-                      fillcolor=THEME['SUCCESS'], opacity=0.09, layer="below", line_width=0) # More subtle opacity
+    # Hand all traces to the figure at once instead of one add_trace call each
+    fig = go.Figure(data=traces)
+
+    # Shaded background areas, passed as plain dicts in the single update_layout call below
+    zone_shapes = []
+    if len(dates) >= 1:
+        date_min = first_date - pd.Timedelta(days=0.5) # Extend slightly for visuals
+        date_max = last_date + pd.Timedelta(days=0.5)
+        zone_shapes = [
+            dict(type="rect", xref="x", yref="y",
+                 x0=date_min, y0=-1.05, x1=date_max, y1=risk_threshold,
+                 fillcolor=THEME['ACCENT'], opacity=0.06, layer="below", line_width=0), # More subtle opacity
+            dict(type="rect", xref="x", yref="y",
+                 x0=date_min, y0=risk_threshold, x1=date_max, y1=1.05,
+                 fillcolor=THEME['SUCCESS'], opacity=0.09, layer="below", line_width=0), # More subtle opacity
+        ]
 
 
     # Update layout for compact aesthetics
@@ -127,6 +143,7 @@ def create_plotly_chart(df, risk_threshold, show_rolling_avg=True, window=7, pla
         ),
         margin=dict(l=40, r=20, t=35, b=30), # Adjusted top margin for title
         height=380,
+        shapes=zone_shapes,
     )
 
     return fig
@@ -144,21 +161,24 @@ def create_weekly_summary_chart(weekly_data):
 
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
-    min_values = weekly_data['min'].fillna(0).values
-    max_values = weekly_data['max'].fillna(0).values
-    risk_days = weekly_data['risk_days'].fillna(0).astype(int).values
+    # Plain NumPy arrays for the bars, error bars and hover data (empty weeks count as 0)
+    mean_values = weekly_data['mean'].to_numpy(dtype=float)
+    min_values = weekly_data['min'].to_numpy(dtype=float, na_value=0.0)
+    max_values = weekly_data['max'].to_numpy(dtype=float, na_value=0.0)
+    risk_days = weekly_data['risk_days'].to_numpy(dtype=float, na_value=0).astype(int)
+    week_ending = weekly_data['week_ending'].to_numpy() # One x array shared by both traces
 
     fig.add_trace(
         go.Bar(
-            x=weekly_data['week_ending'],
-            y=weekly_data['mean'],
+            x=week_ending,
+            y=mean_values,
             name='Avg Score (Min/Max)',
             marker_color=THEME['PRIMARY'],
             opacity=0.7,
             error_y=dict(
                 type='data', symmetric=False,
-                array=max_values - weekly_data['mean'].values,
-                arrayminus=weekly_data['mean'].values - min_values,
+                array=max_values - mean_values,
+                arrayminus=mean_values - min_values,
                 color=THEME['TEXT_LIGHT'], thickness=1, width=2,
             ),
             hovertemplate=(
@@ -173,7 +193,7 @@ def create_weekly_summary_chart(weekly_data):
 
     fig.add_trace(
         go.Scatter(
-            x=weekly_data['week_ending'],
+            x=week_ending,
             y=risk_days,
             name='Risk Days',
             mode='lines+markers',
@@ -184,7 +204,7 @@ def create_weekly_summary_chart(weekly_data):
         secondary_y=True,
     )
 
-    max_risk_days_val = max(weekly_data['risk_days'].fillna(0).astype(int).max(), 1) if not weekly_data.empty else 1
+    max_risk_days_val = max(int(risk_days.max()), 1) # Reuses the filled array; empty data returned above
     fig.update_layout(
          # --- REINSTATED TITLE ---
         title=dict(
@@ -237,4 +257,20 @@ def create_weekly_summary_chart(weekly_data):
         height=350,
     )
 
-    return fig
\ No newline at end of file
+    return fig
+
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
+def cached_plotly_chart(df, risk_threshold, show_rolling_avg=True, window=7, player_name="Unknown Player"):
+    """
+    Cached create_plotly_chart for the dashboard, returned as a plain figure dict so
+    reruns with the same data and settings skip building and validating the figure.
+    Bounded (max_entries, ttl) since every threshold/window/player change adds a key.
+    """
+    return create_plotly_chart(df, risk_threshold, show_rolling_avg, window, player_name).to_dict()
+
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
+def cached_weekly_summary_chart(weekly_data):
+    """
+    Cached create_weekly_summary_chart for the dashboard, returned as a plain figure dict.
+    """
+    return create_weekly_summary_chart(weekly_data).to_dict()